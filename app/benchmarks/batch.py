@@ -0,0 +1,78 @@
+"""
+Cloe Batch Benchmark
+
+Compares reading the bubbles of a page one by one against one batched
+pass. Needs the MangaOCR model. Run from the app directory:
+
+    python -m benchmarks.batch
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import time
+
+from PIL import Image, ImageDraw
+
+from utils.scripts import loadModel, recognizeBatch, warmUpModel
+
+
+def makeBubble(width: int, height: int, seed: int) -> Image.Image:
+    """
+    Creates a bubble-like crop with a few columns of dark strokes
+    """
+    image = Image.new("L", (width, height), 250)
+    draw = ImageDraw.Draw(image)
+    for column in range(1 + seed % 3):
+        x = width - 30 - column * 28
+        for y in range(15, height - 25, 22):
+            draw.rectangle((x, y, x + 16, y + 14), fill=15)
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--bubbles", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = loadModel()
+    bubbles = [
+        makeBubble(120 + 20 * (i % 3), 240 + 40 * (i % 4), i)
+        for i in range(args.bubbles)
+    ]
+    warmUpModel(model, [b.size for b in bubbles])
+
+    sequential, batched = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for bubble in bubbles:
+            model(bubble)
+        sequential.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        recognizeBatch(model, bubbles)
+        batched.append(time.perf_counter() - start)
+
+    best = min(sequential), min(batched)
+    print(f"{args.bubbles} bubbles")
+    print(f"  sequential: {best[0] * 1000:8.0f} ms")
+    print(f"  batched:    {best[1] * 1000:8.0f} ms ({best[0] / best[1]:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
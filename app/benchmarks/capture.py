@@ -0,0 +1,93 @@
+"""
+Cloe Capture Benchmark
+
+Times the capture of a selection with the full-screen grab, which grabs
+and scales the whole screen before cropping, and with grabRegion, which
+grabs only the selection. Also reports the share of pixels each backend
+copies. Needs a real display, the offscreen platform cannot grab the
+screen. Run from the app directory:
+
+    python -m benchmarks.capture
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import statistics
+import time
+from typing import Callable
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QScreen
+from PyQt5.QtWidgets import QApplication
+
+from utils.scripts import grabRegion
+
+SELECTIONS = [(200, 200), (300, 600), (800, 800), (1600, 900)]
+
+
+def fullGrab(screen: QScreen, rect: QRect):
+    """
+    The capture path before grabRegion: grab, scale, then crop
+    """
+    s = screen.size()
+    pixmap = screen.grabWindow(0).scaled(s.width(), s.height())
+    return pixmap.copy(rect).toImage()
+
+
+def measure(fn: Callable, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    screen = app.primaryScreen()
+    if screen.grabWindow(0, 0, 0, 1, 1).isNull():
+        raise SystemExit("The screen cannot be grabbed on this platform")
+
+    size, ratio = screen.size(), screen.devicePixelRatio()
+    physical = size.width() * size.height() * ratio**2
+    print(f"screen {size.width()}x{size.height()} @{ratio:g}x")
+    print(
+        f"{'selection':>10}{'full':>11}{'region':>11}"
+        f"{'full pixels':>14}{'region pixels':>16}"
+    )
+    for w, h in SELECTIONS:
+        w, h = min(w, size.width()), min(h, size.height())
+        rect = QRect((size.width() - w) // 2, (size.height() - h) // 2, w, h)
+        full = measure(lambda: fullGrab(screen, rect), args.repeat)
+        region = measure(lambda: grabRegion(screen, rect), args.repeat)
+        # The full grab copies the screen, its scaled copy and the crop
+        fullPixels = physical + size.width() * size.height() + w * h
+        regionPixels = w * h * ratio**2
+        print(
+            f"{f'{w}x{h}':>10}{full:>8.2f} ms{region:>8.2f} ms"
+            f"{fullPixels / 1e6:>12.2f} M{regionPixels / 1e6:>14.2f} M"
+        )
+
+
+if __name__ == "__main__":
+    main()
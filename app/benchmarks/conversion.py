@@ -0,0 +1,102 @@
+"""
+Cloe Conversion Benchmark
+
+Compares the legacy PNG round trip against the zero-copy conversion used by
+pixmapToText. Run from the app directory:
+
+    python -m benchmarks.conversion
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import statistics
+import time
+from io import BytesIO
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+from PyQt5.QtCore import QBuffer
+from PyQt5.QtGui import QImage
+
+from utils.scripts import arrayToPillow, imageToArray
+
+SIZES = {
+    "200px": (200, 200),
+    "800px": (800, 800),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+
+def makeImage(width: int, height: int) -> QImage:
+    """
+    Creates a page-like RGB32 image: light background with dark strokes
+    """
+    rng = np.random.default_rng(0)
+    pixels = np.full((height, width, 4), 245, np.uint8)
+    for _ in range(max(1, width * height // 4000)):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        pixels[y : y + 3, x : x + 12, :3] = rng.integers(0, 60)
+    image = QImage(pixels.data, width, height, width * 4, QImage.Format_RGB32)
+    # Detach from the NumPy buffer so the image owns its pixels
+    return image.copy()
+
+
+def pngRoundTrip(image: QImage) -> Image.Image:
+    buffer = QBuffer()
+    buffer.open(QBuffer.ReadWrite)
+    image.save(buffer, "PNG")
+    pillowImage = Image.open(BytesIO(buffer.data()))
+    return pillowImage.convert("L")
+
+
+def zeroCopy(image: QImage) -> Image.Image:
+    return arrayToPillow(imageToArray(image))
+
+
+def measure(fn: Callable, image: QImage, repeat: int) -> float:
+    """
+    Returns the median duration of fn(image) in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(image)
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'size':>8} {'png (ms)':>10} {'zero-copy (ms)':>15} {'speedup':>8}"
+    )
+    for label, (w, h) in SIZES.items():
+        image = makeImage(w, h)
+        # Both paths must hand the model the same pixels
+        assert pngRoundTrip(image).tobytes() == zeroCopy(image).tobytes()
+        png = measure(pngRoundTrip, image, args.repeat)
+        fast = measure(zeroCopy, image, args.repeat)
+        print(f"{label:>8} {png:>10.2f} {fast:>15.2f} {png / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
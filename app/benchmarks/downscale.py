@@ -0,0 +1,102 @@
+"""
+Cloe Downscale Benchmark
+
+Times the conversion of a crop into the 224x224 model input over growing
+selection sizes, on the full crop and after downscaleImage. After
+downscaling, the conversion cost stays flat, and only the Qt downscale
+still grows with the selection. The mean difference of the model inputs
+shows what the model sees is unchanged. Run from the app directory:
+
+    python -m benchmarks.downscale
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable
+
+# Must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PIL import Image
+from PyQt5.QtGui import QGuiApplication, QImage
+
+from benchmarks.conversion import makeImage
+from utils.constants import MODEL_INPUT_SIZE
+from utils.scripts import arrayToPillow, downscaleImage, imageToArray
+
+SELECTIONS = [
+    (200, 200),
+    (400, 800),
+    (800, 800),
+    (1600, 900),
+    (1920, 1080),
+    (3000, 1500),
+]
+
+
+def modelInput(image: QImage) -> np.ndarray:
+    """
+    Runs the crop pipeline up to the resize of the feature extractor
+    """
+    pillowImage = arrayToPillow(imageToArray(image)).convert("RGB")
+    size = (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)
+    return np.asarray(pillowImage.resize(size, Image.BILINEAR))
+
+
+def measure(fn: Callable, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    app = QGuiApplication([])
+    print(
+        f"{'selection':>10}{'full':>11}{'downscale':>12}{'then convert':>15}"
+        f"{'difference':>12}"
+    )
+    for w, h in SELECTIONS:
+        image = makeImage(w, h)
+        small = downscaleImage(image)
+        full = measure(lambda: modelInput(image), args.repeat)
+        scale = measure(lambda: downscaleImage(image), args.repeat)
+        convert = measure(lambda: modelInput(small), args.repeat)
+        # Mean absolute difference (0-255) of what the model sees
+        difference = np.abs(
+            modelInput(image).astype(np.int16)
+            - modelInput(small).astype(np.int16)
+        ).mean()
+        print(
+            f"{f'{w}x{h}':>10}{full:>8.2f} ms{scale:>9.2f} ms"
+            f"{convert:>12.2f} ms{difference:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Cloe Pipeline Benchmark
+
+Times each stage of the snip-to-text path (frame upload, crop, trim,
+downscale, conversion, hashing, inference, text post-processing, cache
+store) over a matrix of screen resolutions and crop sizes, and compares the
+medians to baseline.json. Runs offscreen with a stub model by default.
+Run from the app directory:
+
+    python -m benchmarks.pipeline [--real] [--record]
+
+The run fails if a stage regressed, or if the baseline is missing or was
+recorded with a different model, system, machine or Python version. Pass
+--record to write a new baseline instead, such as on a new CI machine.
+
+The offscreen platform cannot grab the screen, so there is no capture
+stage. The upload stage turns a synthetic frame of the physical resolution
+into a QPixmap, the closest step to a grab that runs offscreen. Use
+benchmarks.capture on a real display to time the grab. As in
+captureScreen, the frame keeps its resolution and the crop maps the
+logical selection to physical pixels.
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+# Must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PIL import Image
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QGuiApplication, QImage, QPixmap
+
+from benchmarks.conversion import makeImage
+from utils.cache import OCRCache
+from utils.engine import postProcess
+from utils.scripts import (
+    arrayToPillow,
+    downscaleImage,
+    imageToArray,
+    trimImage,
+)
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name: (logical width, logical height, device pixel ratio)
+SCREENS = {
+    "1080p": (1920, 1080, 1.0),
+    "1440p": (2560, 1440, 1.0),
+    "4K": (3840, 2160, 1.0),
+    "1080p@2x": (1920, 1080, 2.0),
+}
+CROPS = {
+    "200x200": (200, 200),
+    "300x600": (300, 600),
+    "800x800": (800, 800),
+}
+
+
+class StubModel:
+    """
+    Stands in for MangaOcr with the same image preprocessing and no network
+    """
+
+    # Decoded tokens before post-processing, as the tokenizer returns them
+    text = "「 ほ ん と に … … 大 丈 夫 ? 」 ABC 123 "
+
+    def __call__(self, image: Image.Image) -> str:
+        image.convert("L").convert("RGB").resize((224, 224), Image.BILINEAR)
+        return self.text
+
+
+def measure(fn: Callable, repeat: int) -> dict:
+    """
+    Returns the median and 95th percentile duration of fn() in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "median": round(statistics.median(durations), 3),
+        "p95": round(durations[int(0.95 * (len(durations) - 1))], 3),
+    }
+
+
+def runPipeline(model: Callable, repeat: int) -> list[dict]:
+    cache = OCRCache(64 * 1024 * 1024)
+    results = []
+    for screenName, (w, h, dpr) in SCREENS.items():
+        frame = makeImage(int(w * dpr), int(h * dpr))
+        pixmap = QPixmap.fromImage(frame)
+        pixmap.setDevicePixelRatio(dpr)
+
+        for cropName, (cw, ch) in CROPS.items():
+            logicalRect = QRect((w - cw) // 2, (h - ch) // 2, cw, ch)
+            rect = QRect(
+                int(logicalRect.x() * dpr),
+                int(logicalRect.y() * dpr),
+                int(cw * dpr),
+                int(ch * dpr),
+            )
+            crop = pixmap.copy(rect).toImage()
+            trimmed = trimImage(crop)
+            image = downscaleImage(trimmed)
+            array = imageToArray(image)
+            pillowImage = arrayToPillow(array)
+            text = model(pillowImage)
+            keys = cache.keys(array)
+
+            stages = {
+                "upload": lambda: QPixmap.fromImage(frame),
+                "crop": lambda: pixmap.copy(rect).toImage(),
+                "trim": lambda: trimImage(crop),
+                "downscale": lambda: downscaleImage(trimmed),
+                "convert": lambda: arrayToPillow(imageToArray(image)),
+                "hash": lambda: cache.keys(array),
+                "inference": lambda: model(pillowImage),
+                # MangaOcr post-processes inside the call, which the stub
+                # leaves out, and pixmapToText strips the result
+                "postprocess": lambda: postProcess(text).strip(),
+                "store": lambda: cache.put(keys, text.strip()),
+            }
+            for stage, fn in stages.items():
+                # Inference dominates, so fewer repeats keep the run short
+                n = max(3, repeat // 5) if stage == "inference" else repeat
+                results.append(
+                    {
+                        "screen": screenName,
+                        "crop": cropName,
+                        "stage": stage,
+                        **measure(fn, n),
+                    }
+                )
+    return results
+
+
+def compare(
+    results: list[dict], baseline: dict, tolerance: float, floor: float
+):
+    """
+    Returns the results whose median regressed past the baseline
+    """
+    reference = {
+        (r["screen"], r["crop"], r["stage"]): r["median"]
+        for r in baseline["results"]
+    }
+    regressions = []
+    for r in results:
+        before = reference.get((r["screen"], r["crop"], r["stage"]))
+        if before is None:
+            continue
+        # Sub-floor differences are timer noise, not regressions
+        if (
+            r["median"] > before * (1 + tolerance)
+            and r["median"] - before > floor
+        ):
+            regressions.append({**r, "baseline": before})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--real", action="store_true", help="Use MangaOcr")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Write the results to this file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Write the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="Allowed slowdown relative to the baseline (1.0 = 100%%)",
+    )
+    parser.add_argument(
+        "--floor",
+        type=float,
+        default=0.5,
+        help="Slowdowns below this many milliseconds are ignored",
+    )
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    if args.real:
+        from utils.scripts import loadModel, warmUpModel
+
+        model = loadModel()
+        warmUpModel(model, list(CROPS.values()))
+    else:
+        model = StubModel()
+
+    report = {
+        "meta": {
+            "model": "MangaOcr" if args.real else "stub",
+            "system": platform.system(),
+            "machine": platform.machine(),
+            "python": ".".join(platform.python_version_tuple()[:2]),
+            "repeat": args.repeat,
+        },
+        "results": runPipeline(model, args.repeat),
+    }
+
+    for r in report["results"]:
+        print(
+            f"{r['screen']:>9} {r['crop']:>8} {r['stage']:>12} "
+            f"{r['median']:>9.3f} ms (p95 {r['p95']:.3f})"
+        )
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.record:
+        with open(args.baseline, "w") as fh:
+            json.dump(report, fh, indent=2)
+            fh.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f"No baseline at {args.baseline}, pass --record to write one")
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    for key in ("model", "system", "machine", "python"):
+        if baseline["meta"].get(key) != report["meta"][key]:
+            sys.exit(
+                f"Baseline was recorded with {key} "
+                f"{baseline['meta'].get(key)}, not {report['meta'][key]}. "
+                "Pass --record to write a baseline for this one"
+            )
+
+    regressions = compare(
+        report["results"], baseline, args.tolerance, args.floor
+    )
+    for r in regressions:
+        print(
+            f"REGRESSION {r['screen']} {r['crop']} {r['stage']}: "
+            f"{r['baseline']:.3f} ms -> {r['median']:.3f} ms",
+            file=sys.stderr,
+        )
+    if regressions:
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Cloe Quantization Benchmark
+
+Compares the fp32 and int8 engines of loadModel on the bundled sample
+lines: latency per crop, resident memory the loaded model adds, and
+character accuracy.
+The samples are rendered at runtime with a Japanese font. Run from the app
+directory:
+
+    python -m benchmarks.quantization [--font path/to/font]
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.scripts import loadModel, warmUpModel
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "samples.txt")
+
+# Fonts with Japanese glyphs that ship with common systems
+FONTS = [
+    "C:/Windows/Fonts/msgothic.ttc",
+    "C:/Windows/Fonts/meiryo.ttc",
+    "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+]
+
+
+def renderVertical(text: str, font: ImageFont.FreeTypeFont) -> Image.Image:
+    """
+    Renders text top to bottom like a single-column speech bubble
+    """
+    size = font.size
+    image = Image.new("L", (size * 2, size * (len(text) + 2)), 255)
+    draw = ImageDraw.Draw(image)
+    for i, character in enumerate(text):
+        draw.text((size // 2, size * (i + 1)), character, 0, font)
+    return image
+
+
+def editDistance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (x != y),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def residentMemory() -> int:
+    """
+    Returns the resident set size of this process in bytes
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+            ] + [
+                (name, ctypes.c_size_t)
+                for name in (
+                    "PeakWorkingSetSize",
+                    "WorkingSetSize",
+                    "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage",
+                    "PagefileUsage",
+                    "PeakPagefileUsage",
+                )
+            ]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            process, ctypes.byref(counters), counters.cb
+        )
+        return counters.WorkingSetSize
+
+    if os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+
+    # macOS only reports the peak, in bytes
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def loadMeasured(engine: str):
+    """
+    Loads the model and returns it with the resident memory it added in MB
+    """
+    gc.collect()
+    before = residentMemory()
+    model = loadModel(engine)
+    gc.collect()
+    return model, (residentMemory() - before) / 2**20
+
+
+def evaluate(model, crops: list[Image.Image], truths: list[str], repeat: int):
+    latencies, errors = [], 0
+    for crop, truth in zip(crops, truths):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = model(crop)
+            latencies.append((time.perf_counter() - start) * 1000)
+        errors += editDistance(text, truth)
+    characters = sum(len(truth) for truth in truths)
+    return {
+        "latency": statistics.median(latencies),
+        "accuracy": 1 - errors / characters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--font", help="Font with Japanese glyphs")
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fonts = [args.font] if args.font else FONTS
+    fontPath = next((f for f in fonts if os.path.exists(f)), None)
+    if fontPath is None:
+        parser.error("no Japanese font found, pass one with --font")
+    font = ImageFont.truetype(fontPath, args.size)
+
+    with open(SAMPLES, encoding="utf-8") as fh:
+        truths = [line.strip() for line in fh if line.strip()]
+    crops = [renderVertical(truth, font) for truth in truths]
+
+    # Imported up front, so that the libraries are not counted as the
+    # memory of the first model
+    import manga_ocr  # noqa: F401
+
+    results = {}
+    for engine in ("fp32", "int8"):
+        model, memory = loadMeasured(engine)
+        warmUpModel(model, [crop.size for crop in crops[:4]])
+        results[engine] = evaluate(model, crops, truths, args.repeat)
+        results[engine]["memory"] = memory
+        del model
+
+    print(f"{len(crops)} samples rendered with {os.path.basename(fontPath)}")
+    print(f"{'':6}{'latency':>12}{'memory':>12}{'accuracy':>10}")
+    for engine, r in results.items():
+        print(
+            f"{engine:6}{r['latency']:>9.0f} ms{r['memory']:>9.0f} MB"
+            f"{r['accuracy']:>10.1%}"
+        )
+    fp32, int8 = results["fp32"], results["int8"]
+    print(
+        f"int8 is {fp32['latency'] / int8['latency']:.1f}x faster, "
+        f"{fp32['memory'] / int8['memory']:.1f}x less memory, "
+        f"accuracy {(int8['accuracy'] - fp32['accuracy']) * 100:+.1f} points"
+    )
+
+
+if __name__ == "__main__":
+    main()
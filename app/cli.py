@@ -0,0 +1,196 @@
+"""
+Cloe Headless Batch OCR
+
+Reads image files with the MangaOCR model without a display or the system
+tray. Run from the app directory:
+
+    python cli.py ./panels -o results.jsonl --workers 4 --threads 2
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Iterator
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp", ".gif")
+
+# Set by initWorker in every worker process
+_model = None
+
+
+def findImages(source: str) -> Iterator[str]:
+    """
+    Yields image paths from a directory (recursively) or a glob pattern
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+    else:
+        yield from sorted(glob.iglob(source, recursive=True))
+
+
+def readDone(output: str) -> set[str]:
+    """
+    Returns the paths already read successfully according to the output file
+    """
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, "r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            # Failed files are retried
+            if "text" in result:
+                done.add(result["path"])
+    return done
+
+
+def initWorker(threads: int, engine: str):
+    global _model
+    if engine == "onnx":
+        from utils.constants import ONNX_MODEL_DIR
+        from utils.engine import OnnxModel
+
+        _model = OnnxModel(ONNX_MODEL_DIR, threads)
+        return
+
+    import torch
+
+    from utils.scripts.loadModel import loadModel
+
+    torch.set_num_threads(threads)
+    _model = loadModel(engine)
+
+
+def readImage(path: str) -> dict:
+    """
+    Reads one file the way pixmapToText reads a crop
+    """
+    from PyQt5.QtGui import QImage
+
+    from utils.scripts import arrayToPillow, imageToArray, prepareCrop
+
+    start = time.perf_counter()
+    try:
+        image = QImage(path)
+        if image.isNull():
+            raise ValueError("not a readable image")
+        prepared = prepareCrop(image)
+        if prepared is None:
+            text = ""
+        else:
+            # The array is a view, so keep the prepared image referenced
+            image, _ = prepared
+            text = _model(arrayToPillow(imageToArray(image))).strip()
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+    return {
+        "path": path,
+        "text": text,
+        "latency": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("source", help="Image directory or glob pattern")
+    parser.add_argument("-o", "--output", default="results.jsonl")
+    parser.add_argument(
+        "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2)
+    )
+    parser.add_argument(
+        "--threads", type=int, default=2, help="Inference threads per worker"
+    )
+    parser.add_argument(
+        "--engine", choices=("fp32", "int8", "onnx"), default="fp32"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Read every image even if it is already in the output",
+    )
+    args = parser.parse_args()
+
+    if args.engine == "onnx":
+        from utils.constants import ONNX_MODEL_DIR
+
+        if not os.path.exists(os.path.join(ONNX_MODEL_DIR, "config.json")):
+            parser.error("export the model first: python -m utils.engine")
+
+    done = set() if args.no_resume else readDone(args.output)
+    paths = (path for path in findImages(args.source) if path not in done)
+    mode = "w" if args.no_resume else "a"
+
+    count, errors, start = 0, 0, time.perf_counter()
+
+    def record(finished: set, fh):
+        nonlocal count, errors
+        if not finished:
+            return
+        for future in finished:
+            result = future.result()
+            errors += "error" in result
+            count += 1
+            fh.write(json.dumps(result, ensure_ascii=False) + "\n")
+        # Flushed per batch so that an interrupted run can be resumed
+        fh.flush()
+        rate = count / (time.perf_counter() - start)
+        print(
+            f"\r{count} images, {rate:.1f} images/s", end="", file=sys.stderr
+        )
+
+    # Keep a few files per worker in flight instead of queuing them all
+    limit = args.workers * 4
+    with open(args.output, mode, encoding="utf-8") as fh, ProcessPoolExecutor(
+        args.workers,
+        mp_context=get_context("spawn"),
+        initializer=initWorker,
+        initargs=(args.threads, args.engine),
+    ) as pool:
+        pending = set()
+        for path in paths:
+            pending.add(pool.submit(readImage, path))
+            if len(pending) >= limit:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                record(finished, fh)
+        record(wait(pending).done, fh)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"\r{count} images in {elapsed:.1f} s "
+        f"({count / elapsed if elapsed else 0:.1f} images/s), "
+        f"{errors} errors, {len(done)} skipped",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
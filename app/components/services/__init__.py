@@ -18,4 +18,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from .hotkeys import Hotkeys
-from .workers import BaseWorker, BaseWorkerSignal
+from .scheduler import OCRScheduler
+from .store import SettingsStore
+from .watcher import RegionWatcher
+from .workers import BaseWorker, BaseWorkerSignal, InferenceWorker
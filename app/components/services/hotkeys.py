@@ -17,10 +17,13 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import time
+
 from pynput.keyboard import GlobalHotKeys
 from PyQt5.QtCore import QObject
 
 from .workers import BaseWorkerSignal
+from utils.tracing import tracer
 
 
 class Hotkeys(GlobalHotKeys):
@@ -32,6 +35,9 @@ class Hotkeys(GlobalHotKeys):
     hotkeys is a [str, tuple] dictionary with the following scheme:
         h (str): Hotkey combination
         tuple[obj (QObject), fn (str)]: Object/widget with function named fn
+
+    The result signal emits (obj, fn, pressedAt), where pressedAt is the
+    time.perf_counter() of the key press.
     """
 
     def __init__(
@@ -44,4 +50,8 @@ class Hotkeys(GlobalHotKeys):
         self.signals = BaseWorkerSignal()
 
     def onPress(self, obj: QObject, fn: str):
-        self.signals.result.emit((obj, fn))
+        # Runs on the pynput listener thread
+        pressedAt = time.perf_counter()
+        tracer.newSnip()
+        with tracer.span("Hotkeys.onPress"):
+            self.signals.result.emit((obj, fn, pressedAt))
@@ -0,0 +1,149 @@
+"""
+Cloe OCR Scheduler
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+from typing import Callable, Optional
+
+from PyQt5.QtCore import (
+    QEventLoop,
+    QObject,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+from .workers import InferenceWorker
+
+logger = logging.getLogger("cloe")
+
+
+class OCRScheduler(QObject):
+    """Runs OCR requests one at a time, always favouring the newest request
+
+    Args:
+        fn (Callable): Function that returns the text for a request.
+        threadpool (QThreadPool, optional): Pool to run fn on. Defaults to the
+        global instance.
+        parent (QObject, optional): Parent object. Defaults to None.
+
+    Every request is tagged with an increasing generation. While an inference
+    is in flight, a new request replaces any request that is still queued,
+    and results of older generations are dropped instead of emitted.
+
+    Signals:
+        result (int, str): Emit the generation and text of the newest request
+    """
+
+    result = pyqtSignal(int, str)
+
+    def __init__(
+        self,
+        fn: Callable[..., str],
+        threadpool: Optional[QThreadPool] = None,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._fn = fn
+        self._threadpool = threadpool or QThreadPool.globalInstance()
+
+        self.generation = 0
+        self._pending: Optional[tuple] = None
+        self._running = False
+        self._completed: Optional[tuple[int, str]] = None
+
+    # ----------------------------------- Requests ---------------------------------- #
+
+    def request(self, *args, **kwargs) -> int:
+        """
+        Queues fn(*args, **kwargs) and returns the generation of the request
+        """
+        self.generation += 1
+        self._pending = (self.generation, args, kwargs)
+        self._startPending()
+        return self.generation
+
+    def reset(self):
+        """
+        Drops the queued request and the results of every earlier request
+        """
+        # An inference in flight still finishes, but its result is of an
+        # older generation and is not emitted.
+        self.generation += 1
+        self._pending = None
+        self._completed = None
+
+    def waitForResult(self, generation: int, timeout: int) -> Optional[str]:
+        """Waits for the result of a request without blocking the event loop
+
+        Args:
+            generation (int): Generation returned by request.
+            timeout (int): Maximum time to wait in milliseconds.
+
+        Returns None if the result did not arrive in time.
+        """
+        if self._completed and self._completed[0] == generation:
+            return self._completed[1]
+
+        loop = QEventLoop()
+        received: list[str] = []
+
+        def onResult(resultGeneration: int, text: str):
+            if resultGeneration == generation:
+                received.append(text)
+                loop.quit()
+
+        self.result.connect(onResult)
+        QTimer.singleShot(timeout, loop.quit)
+        # User input is held back so that the view is not re-entered
+        loop.exec_(QEventLoop.ExcludeUserInputEvents)
+        self.result.disconnect(onResult)
+        return received[0] if received else None
+
+    # ----------------------------------- Workers ----------------------------------- #
+
+    def _startPending(self):
+        if self._running or self._pending is None:
+            return
+        generation, args, kwargs = self._pending
+        self._pending = None
+        self._running = True
+
+        worker = InferenceWorker(self._run, generation, *args, **kwargs)
+        worker.signals.result.connect(self._onFinished)
+        self._threadpool.start(worker)
+
+    def _run(self, generation: int, *args, **kwargs) -> tuple[int, str]:
+        # Runs on the worker thread. Errors are reported as empty text,
+        # otherwise the scheduler would wait on the request forever.
+        try:
+            return generation, self._fn(*args, **kwargs)
+        except Exception:
+            logger.exception("OCR request %d failed", generation)
+            return generation, ""
+
+    @pyqtSlot(object)
+    def _onFinished(self, output: tuple[int, str]):
+        self._running = False
+        generation, text = output
+        if generation == self.generation:
+            self._completed = output
+            self.result.emit(generation, text)
+        self._startPending()
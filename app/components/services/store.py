@@ -0,0 +1,186 @@
+"""
+Cloe Settings Store
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import os
+from typing import Any, Optional
+
+from PyQt5.QtCore import (
+    QFileSystemWatcher,
+    QObject,
+    QSettings,
+    QTimer,
+    pyqtSignal,
+)
+
+from utils.constants import SETTINGS_WRITE_DELAY
+
+
+def _normalize(value: Any) -> Any:
+    # Scalars are read back from the file as strings
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+class SettingsStore(QObject):
+    """In-memory copy of an INI settings file shared by the whole app
+
+    Args:
+        file (str): Path to the configuration file. Must be in ini format.
+
+    The file is parsed once. Values are served from memory, and changes are
+    written back in one batch shortly after the last change. The file is
+    watched, so edits made outside the app are picked up as well. Use
+    forFile to get the store of a file instead of constructing one.
+
+    Signals:
+        changed (str, object): Emit the key and new value of a changed
+        setting. The value is None if the setting was removed.
+    """
+
+    changed = pyqtSignal(str, object)
+
+    _stores: dict[str, "SettingsStore"] = {}
+
+    def __init__(self, file: str):
+        super().__init__()
+        self.file = file
+        self._settings = QSettings(file, QSettings.IniFormat)
+        self._values: dict[str, Any] = self._read(self._settings)
+        self._dirty: set[str] = set()
+
+        self._writeTimer = QTimer(self)
+        self._writeTimer.setInterval(SETTINGS_WRITE_DELAY)
+        self._writeTimer.setSingleShot(True)
+        self._writeTimer.timeout.connect(self.flush)
+
+        # QSettings replaces the file on save, which drops it from the
+        # watcher, so the directory is watched to add it back.
+        self._watcher = QFileSystemWatcher(self)
+        directory = os.path.dirname(os.path.abspath(file))
+        if os.path.isdir(directory):
+            self._watcher.addPath(directory)
+        self._watchFile()
+        self._watcher.fileChanged.connect(self.reload)
+        self._watcher.directoryChanged.connect(self._onDirectoryChanged)
+
+    @classmethod
+    def forFile(cls, file: str) -> "SettingsStore":
+        """
+        Returns the store of the file, creating it on first use
+        """
+        key = os.path.abspath(file)
+        if key not in cls._stores:
+            cls._stores[key] = cls(file)
+        return cls._stores[key]
+
+    @classmethod
+    def flushAll(cls):
+        for store in cls._stores.values():
+            store.flush()
+
+    # ------------------------------------ Values ----------------------------------- #
+
+    def value(
+        self, key: str, default: Any = None, type: Optional[type] = None
+    ):
+        """
+        Returns the value of the key, or default if it is not set
+        """
+        value = self._values.get(key, default)
+        if type is not None and value is not None:
+            return type(value)
+        return value
+
+    def setValue(self, key: str, value: Any):
+        # Kept in the form QSettings reads back, so that readers see the
+        # same types before and after a reload
+        value = _normalize(value)
+        if key in self._values and self._values[key] == value:
+            return
+        self._values[key] = value
+        self._dirty.add(key)
+        self._writeTimer.start()
+        self.changed.emit(key, value)
+
+    def clear(self):
+        self._writeTimer.stop()
+        keys = list(self._values)
+        self._values = {}
+        self._dirty = set()
+        self._settings.clear()
+        self._settings.sync()
+        for key in keys:
+            self.changed.emit(key, None)
+
+    # ------------------------------------- File ------------------------------------ #
+
+    def flush(self):
+        """
+        Writes the changed values to the file
+        """
+        self._writeTimer.stop()
+        if not self._dirty:
+            return
+        for key in self._dirty:
+            self._settings.setValue(key, self._values[key])
+        self._dirty = set()
+        self._settings.sync()
+        self._watchFile()
+
+    def reload(self):
+        """
+        Re-reads the file and emits the values that were changed outside the app
+        """
+        self._watchFile()
+        values = self._read(QSettings(self.file, QSettings.IniFormat))
+        for key in set(self._values) | set(values):
+            # Unsaved changes made in the app win over the file
+            if key in self._dirty:
+                continue
+            value = values.get(key)
+            if _normalize(self._values.get(key)) != _normalize(value):
+                if value is None:
+                    self._values.pop(key, None)
+                else:
+                    self._values[key] = value
+                self.changed.emit(key, value)
+        # Keep the QSettings cache in sync for the next batched write
+        self._settings.sync()
+
+    def _read(self, settings: QSettings) -> dict[str, Any]:
+        return {key: settings.value(key) for key in settings.allKeys()}
+
+    def _watchFile(self):
+        if (
+            os.path.exists(self.file)
+            and self.file not in self._watcher.files()
+        ):
+            self._watcher.addPath(self.file)
+
+    def _onDirectoryChanged(self, _: str):
+        # Only react when the file was (re)created
+        if (
+            os.path.exists(self.file)
+            and self.file not in self._watcher.files()
+        ):
+            self.reload()
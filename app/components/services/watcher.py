@@ -0,0 +1,178 @@
+"""
+Cloe Region Watcher
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from PyQt5.QtCore import QObject, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QScreen
+
+from .scheduler import OCRScheduler
+from utils.change import colorChannels
+from utils.constants import (
+    WATCH_GRID,
+    WATCH_MAX_INTERVAL,
+    WATCH_SETTLE_FRAMES,
+    WATCH_TOLERANCE,
+)
+from utils.scripts import grabRegion, imageToArray, logText, pixmapToText
+
+if TYPE_CHECKING:
+    from components.windows.tray import SystemTray
+
+
+class RegionWatcher(QObject):
+    """Reads a fixed region of the screen whenever its content changes
+
+    Args:
+        screen (QScreen): Screen of the region.
+        rect (QRect): Region in logical pixels relative to the screen.
+        interval (int): Polling interval in milliseconds while the region
+        changes.
+        saveLog (bool, optional): Also append the texts to the text log.
+        Defaults to False.
+        parent (SystemTray, optional): Provides the model, cache and history.
+        Defaults to None.
+
+    Each poll grabs only the region and averages every color channel down
+    to a small grid. A frame whose grid differs from the previous one
+    restarts the wait, and the region is read once it stays the same for a
+    few polls, so text that is still being typed out is not read. While
+    nothing changes, the interval doubles up to WATCH_MAX_INTERVAL.
+
+    Signals:
+        textChanged (str): Emit the text each time a different text is read
+    """
+
+    textChanged = pyqtSignal(str)
+
+    def __init__(
+        self,
+        screen: QScreen,
+        rect: QRect,
+        interval: int,
+        saveLog: bool = False,
+        parent: Optional["SystemTray"] = None,
+    ):
+        super().__init__(parent)
+        self.screen = screen
+        self.rect = rect
+        self.saveLog = saveLog
+        self._interval = max(1, interval)
+        self._delay = self._interval
+
+        self._grid: Optional[np.ndarray] = None
+        self._stableFrames = 0
+        self._settling = True
+        self._lastText: Optional[str] = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.poll)
+        self._scheduler = OCRScheduler(pixmapToText, parent=self)
+        self._scheduler.result.connect(self.ocrFinished)
+
+    def start(self):
+        self._timer.start(0)
+
+    def stop(self):
+        self._timer.stop()
+
+    def setInterval(self, interval: int):
+        self._interval = max(1, interval)
+        self._delay = self._interval
+
+    # ------------------------------------ Polls ------------------------------------ #
+
+    def poll(self):
+        image = grabRegion(self.screen, self.rect)
+        grid = self.grid(image)
+        if grid is None:
+            # The region is off screen, check again later
+            self._timer.start(WATCH_MAX_INTERVAL)
+            return
+
+        if self._grid is None or self._changed(grid):
+            self._settling = True
+            self._stableFrames = 0
+            self._delay = self._interval
+        elif self._settling:
+            self._stableFrames += 1
+            if self._stableFrames >= WATCH_SETTLE_FRAMES:
+                self._settling = False
+                self.requestOCR(image)
+        else:
+            self._delay = min(self._delay * 2, WATCH_MAX_INTERVAL)
+        self._grid = grid
+        self._timer.start(self._delay)
+
+    def grid(self, image: QImage) -> Optional[np.ndarray]:
+        """
+        Averages each color channel of the image down to a small grid
+        """
+        if image.isNull():
+            return None
+        # Every channel is kept, so that a change of color alone, such as
+        # highlighted text, counts as a change
+        pixels = np.stack(colorChannels(imageToArray(image)), axis=-1)
+        h, w = pixels.shape[:2]
+        rowEdges = np.linspace(0, h, min(WATCH_GRID, h) + 1, dtype=int)
+        colEdges = np.linspace(0, w, min(WATCH_GRID, w) + 1, dtype=int)
+        sums = np.add.reduceat(
+            np.add.reduceat(pixels, rowEdges[:-1], axis=0, dtype=np.uint32),
+            colEdges[:-1],
+            axis=1,
+        )
+        counts = np.outer(np.diff(rowEdges), np.diff(colEdges))
+        return sums / counts[..., np.newaxis]
+
+    def _changed(self, grid: np.ndarray) -> bool:
+        if grid.shape != self._grid.shape:
+            return True
+        return np.abs(grid - self._grid).max() > WATCH_TOLERANCE
+
+    # ------------------------------------- OCR ------------------------------------- #
+
+    def requestOCR(self, image: QImage):
+        tray = self.parent()
+        if tray is None or tray.ocrModel is None:
+            return
+        origin = self.screen.geometry().topLeft()
+        region = self.rect.translated(origin)
+        self._scheduler.request(
+            image,
+            tray.ocrModel,
+            tray.ocrCache,
+            history=tray.ocrHistory,
+            region=(region.x(), region.y(), region.width(), region.height()),
+        )
+
+    def ocrFinished(self, generation: int, text: str):
+        # Reads of the same text, such as after a blink of the text box,
+        # are not logged again
+        if not text or text == self._lastText:
+            return
+        self._lastText = text
+        logText(
+            text,
+            saveLog=self.saveLog,
+            region=self.rect.translated(self.screen.geometry().topLeft()),
+        )
+        self.textChanged.emit(text)
@@ -18,3 +18,4 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from .base import BaseWorker, BaseWorkerSignal
+from .inference import InferenceWorker
@@ -17,11 +17,13 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import time
 from typing import Callable
 
 from PyQt5.QtCore import QRunnable, pyqtSlot
 
 from .signals import BaseWorkerSignal
+from utils.tracing import tracer
 
 
 class BaseWorker(QRunnable):
@@ -40,8 +42,16 @@ class BaseWorker(QRunnable):
         self.kwargs = kwargs
         self.signals = BaseWorkerSignal()
 
+        # Remember the snip and queue time for the trace
+        self._snip = tracer.snip
+        self._queued = time.perf_counter()
+
     @pyqtSlot()
     def run(self):
-        output = self.fn(*self.args, **self.kwargs)
+        tracer.add(
+            "QThreadPool queue", self._queued, time.perf_counter(), self._snip
+        )
+        with tracer.span("BaseWorker.run", self._snip):
+            output = self.fn(*self.args, **self.kwargs)
         self.signals.result.emit(output)
         self.signals.finished.emit()
@@ -0,0 +1,39 @@
+"""
+Cloe Inference Worker
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from typing import Callable
+
+from .base import BaseWorker
+from utils.threads import threadPolicy
+
+
+class InferenceWorker(BaseWorker):
+    """BaseWorker for model work, run under the inference thread policy
+
+    Args:
+        fn (Callable): Function that runs the model
+
+    *Note: args/kwargs passed onto the InferenceWorker are passed onto fn
+    """
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super(InferenceWorker, self).__init__(
+            threadPolicy.runInference, fn, *args, **kwargs
+        )
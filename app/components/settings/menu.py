@@ -19,7 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from PyQt5.QtWidgets import QVBoxLayout, QWidget, QTabWidget
 
-from .tabs import ViewSettingsTab, HotkeySettingsTab
+from .tabs import ViewSettingsTab, HotkeySettingsTab, PerformanceSettingsTab
 
 
 class SettingsMenu(QWidget):
@@ -35,10 +35,11 @@ class SettingsMenu(QWidget):
         self.tabs = QTabWidget()
         self.tabs.addTab(HotkeySettingsTab(self), "HOTKEYS")
         self.tabs.addTab(ViewSettingsTab(self), "VIEW")
+        self.tabs.addTab(PerformanceSettingsTab(self), "PERFORMANCE")
 
         self.setLayout(QVBoxLayout(self))
         self.layout().addWidget(self.tabs)
         self.setFixedSize(625, 400)
 
-    def onSaveHotkeys(self):
-        self.systemTray.loadHotkeys()
+    def onPerformanceChanged(self, policy: dict):
+        self.systemTray.applyThreadPolicy(policy)
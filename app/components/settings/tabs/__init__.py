@@ -18,4 +18,5 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from .hotkey import HotkeySettingsTab
+from .performance import PerformanceContainer, PerformanceSettingsTab
 from .view import ViewSettingsTab, ViewContainer
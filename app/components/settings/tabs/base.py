@@ -19,10 +19,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from typing import Any, Callable
 
-from PyQt5.QtCore import QSettings
 from PyQt5.QtWidgets import QWidget
 
 from components.popups import BasePopup
+from components.services import SettingsStore
 
 
 class BaseSettings(QWidget):
@@ -36,7 +36,8 @@ class BaseSettings(QWidget):
 
     def __init__(self, parent: QWidget, file: str, prefix: str = ""):
         super().__init__(parent)
-        self.settings = QSettings(file, QSettings.IniFormat)
+        # Shared in-memory copy of the file, see SettingsStore
+        self.settings = SettingsStore.forFile(file)
 
         # Settings widgets may sometimes share the same configuration file.
         # Set the prefix to a unique value to avoid this.
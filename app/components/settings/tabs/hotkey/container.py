@@ -131,7 +131,7 @@ class HotkeyContainer(BaseSettings):
         # Overridden to handle checkbox and combobox
         obj = getattr(self, prop)
         if isinstance(obj, QCheckBox):
-            return obj.setChecked(value.lower() == "true")
+            return obj.setChecked(str(value).lower() == "true")
         elif isinstance(obj, QComboBox):
             return obj.setCurrentIndex(int(value))
         return super().setProperty(prop, value)
@@ -52,7 +52,12 @@ class HotkeySettingsTab(BaseSettingsTab):
         """
 
         self.containers: list[HotkeyContainer] = []
-        actions = ["Start Capture", "Open Settings", "Close Application"]
+        actions = [
+            "Start Capture",
+            "Read Page",
+            "Open Settings",
+            "Close Application",
+        ]
         for action in actions:
             self.containers.append(HotkeyContainer(action))
             self.layout().addWidget(self.containers[-1])
@@ -63,7 +68,6 @@ class HotkeySettingsTab(BaseSettingsTab):
         for container in self.containers:
             container.saveSettings()
         super().saveSettings()
-        self.menu.onSaveHotkeys()
 
     def loadSettings(self):
         for container in self.containers:
@@ -0,0 +1,60 @@
+"""
+Cloe Performance Settings Tab
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from PyQt5.QtWidgets import QWidget
+
+from ..base import BaseSettings
+from utils.constants import PERFORMANCE_CONFIG, PERFORMANCE_DEFAULT
+
+
+def toBool(value) -> bool:
+    return str(value).lower() == "true"
+
+
+class PerformanceContainer(BaseSettings):
+    """
+    Generic container to handle inference performance settings
+    """
+
+    def __init__(self, parent: QWidget, file=PERFORMANCE_CONFIG):
+        super().__init__(parent, file)
+        self._defaults = PERFORMANCE_DEFAULT
+        self._types = {
+            "inferenceProcess": toBool,
+            "intraOpThreads": int,
+            "interOpThreads": int,
+            "reservedCores": int,
+            "cpuAffinity": toBool,
+            "lowPriority": toBool,
+            "watchInterval": int,
+        }
+        self.loadSettings()
+
+    def getThreadPolicy(self) -> dict:
+        """
+        Returns the settings that ThreadPolicy applies live
+        """
+        return {
+            "intraOpThreads": self.intraOpThreads,
+            "interOpThreads": self.interOpThreads,
+            "reservedCores": self.reservedCores,
+            "cpuAffinity": self.cpuAffinity,
+            "lowPriority": self.lowPriority,
+        }
@@ -0,0 +1,243 @@
+"""
+Cloe Performance Settings Tab
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from typing import Any
+
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QGridLayout,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QWidget,
+)
+
+from ..tab import BaseSettingsTab
+from .container import PerformanceContainer
+from components.services import InferenceWorker
+from utils.constants import (
+    ENGINES,
+    LATENCY_MEASURE_ROUNDS,
+    LATENCY_MEASURE_SIZES,
+    PERFORMANCE_CONFIG,
+)
+from utils.scripts import warmUpModel
+from utils.threads import availableCores
+
+
+class PerformanceSettingsTab(PerformanceContainer, BaseSettingsTab):
+    """
+    Settings tab for inference performance settings
+    """
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent, PERFORMANCE_CONFIG)
+
+        self._measurements: list[str] = []
+
+        self.setLayout(QGridLayout(self))
+        self.initControls()
+        self.layout().addWidget(QWidget())
+        self.layout().setRowStretch(self.layout().rowCount() - 1, 1)
+        self.addButtonBar(self.layout().rowCount())
+
+    # ------------------------------ UI Initializations ----------------------------- #
+
+    def initControls(self):
+        """
+        Initialize controls for the inference settings
+        """
+        cores = len(availableCores())
+
+        # --------------------------------- Threads --------------------------------- #
+
+        # Button Initializations
+        _threadsTitle = QLabel("Threads ")
+        self._intraOpThreads = self.createSpinBox("intraOpThreads", cores)
+        self._interOpThreads = self.createSpinBox("interOpThreads", cores)
+
+        # Layout
+        self.layout().addWidget(_threadsTitle, 0, 0, 1, 1)
+        self.layout().addWidget(QLabel("Intra-op"), 0, 1, 1, 1)
+        self.layout().addWidget(self._intraOpThreads, 0, 2, 1, 1)
+        self.layout().addWidget(QLabel("Inter-op"), 0, 3, 1, 1)
+        self.layout().addWidget(self._interOpThreads, 0, 4, 1, 1)
+
+        # ----------------------------------- CPU ----------------------------------- #
+
+        # Button Initializations
+        _cpuTitle = QLabel("CPU ")
+        self._reservedCores = self.createSpinBox("reservedCores", cores - 1)
+        self._reservedCores.setSpecialValueText("None")
+        self._cpuAffinity = QCheckBox("Pin inference to the other cores")
+        self._lowPriority = QCheckBox("Lower inference priority")
+
+        # Layout
+        self.layout().addWidget(_cpuTitle, 1, 0, 1, 1)
+        self.layout().addWidget(QLabel("Cores for UI"), 1, 1, 1, 1)
+        self.layout().addWidget(self._reservedCores, 1, 2, 1, 1)
+        self.layout().addWidget(self._cpuAffinity, 1, 3, 1, -1)
+        self.layout().addWidget(self._lowPriority, 2, 3, 1, -1)
+
+        # Signals and Slots
+        self._cpuAffinity.toggled.connect(
+            lambda checked: self.setPropertyAndApply("cpuAffinity", checked)
+        )
+        self._lowPriority.toggled.connect(
+            lambda checked: self.setPropertyAndApply("lowPriority", checked)
+        )
+
+        # ---------------------------------- Engine --------------------------------- #
+
+        # Button Initializations
+        _engineTitle = QLabel("Engine ")
+        self._engine = QComboBox()
+        self._engine.addItems(ENGINES)
+        self._inferenceProcess = QCheckBox("Separate process")
+        _restartNote = QLabel("(applies after a restart)")
+
+        # Layout
+        self.layout().addWidget(_engineTitle, 3, 0, 1, 1)
+        self.layout().addWidget(self._engine, 3, 1, 1, 2)
+        self.layout().addWidget(self._inferenceProcess, 3, 3, 1, 1)
+        self.layout().addWidget(_restartNote, 3, 4, 1, -1)
+
+        # Signals and Slots
+        self._engine.currentTextChanged.connect(
+            lambda text: self.setProperty("engine", text)
+        )
+        self._inferenceProcess.toggled.connect(
+            lambda checked: self.setProperty("inferenceProcess", checked)
+        )
+
+        # ---------------------------------- Watch ---------------------------------- #
+
+        # Button Initializations
+        _watchTitle = QLabel("Watch ")
+        self._watchInterval = QSpinBox()
+        self._watchInterval.setRange(50, 5000)
+        self._watchInterval.setSingleStep(50)
+        self._watchInterval.setSuffix(" ms")
+
+        # Layout
+        self.layout().addWidget(_watchTitle, 4, 0, 1, 1)
+        self.layout().addWidget(QLabel("Poll every"), 4, 1, 1, 1)
+        self.layout().addWidget(self._watchInterval, 4, 2, 1, 1)
+
+        # Signals and Slots
+        self._watchInterval.valueChanged.connect(
+            lambda value: self.setProperty("watchInterval", value)
+        )
+
+        # --------------------------------- Latency --------------------------------- #
+
+        # Button Initializations
+        _latencyTitle = QLabel("Latency ")
+        self._measureButton = QPushButton("Measure")
+        self._latency = QLabel("")
+        self._latency.setWordWrap(True)
+
+        # Layout
+        self.layout().addWidget(_latencyTitle, 5, 0, 1, 1)
+        self.layout().addWidget(self._measureButton, 5, 1, 1, 2)
+        self.layout().addWidget(self._latency, 6, 1, 1, -1)
+
+        # Signals and Slots
+        self._measureButton.clicked.connect(self.measureLatency)
+
+        self.updateControls()
+
+    def createSpinBox(self, prop: str, maximum: int) -> QSpinBox:
+        spinBox = QSpinBox()
+        spinBox.setRange(0, max(0, maximum))
+        spinBox.setSpecialValueText("Auto")
+        spinBox.valueChanged.connect(
+            lambda value: self.setPropertyAndApply(prop, value)
+        )
+        return spinBox
+
+    def updateControls(self):
+        """
+        Syncs the controls with the current settings
+        """
+        self._intraOpThreads.setValue(self.intraOpThreads)
+        self._interOpThreads.setValue(self.interOpThreads)
+        self._reservedCores.setValue(self.reservedCores)
+        self._cpuAffinity.setChecked(self.cpuAffinity)
+        self._lowPriority.setChecked(self.lowPriority)
+        self._engine.setCurrentText(self.engine)
+        self._inferenceProcess.setChecked(self.inferenceProcess)
+        self._watchInterval.setValue(self.watchInterval)
+
+    # ----------------------------------- Latency ----------------------------------- #
+
+    def measureLatency(self):
+        model = self.menu.systemTray.ocrModel
+        if model is None:
+            self._latency.setText("The model is not loaded yet.")
+            return
+
+        self._measureButton.setEnabled(False)
+        self._latency.setText("Measuring ...")
+        crops = len(LATENCY_MEASURE_SIZES) * LATENCY_MEASURE_ROUNDS
+        policy = self.getThreadPolicy()
+
+        def measure():
+            try:
+                duration = warmUpModel(
+                    model, LATENCY_MEASURE_SIZES, LATENCY_MEASURE_ROUNDS
+                )
+                return f"{duration / crops:.0f} ms per crop"
+            except Exception as e:
+                return str(e)
+
+        def measured(result: str):
+            self._measurements.insert(
+                0,
+                f"{result} (intra-op {policy['intraOpThreads'] or 'auto'}, "
+                f"inter-op {policy['interOpThreads'] or 'auto'}, "
+                f"{policy['reservedCores']} UI cores, "
+                f"pinned {'on' if policy['cpuAffinity'] else 'off'}, "
+                f"low priority {'on' if policy['lowPriority'] else 'off'})",
+            )
+            del self._measurements[5:]
+            self._latency.setText("\n".join(self._measurements))
+            self._measureButton.setEnabled(True)
+
+        # Same pool as the OCR of the snipping window
+        worker = InferenceWorker(measure)
+        worker.signals.result.connect(measured)
+        QThreadPool.globalInstance().start(worker)
+
+    # ----------------------------------- Settings ---------------------------------- #
+
+    def resetSettings(self):
+        # Overridden to update the controls and the policy on reset
+        super().resetSettings()
+        self.updateControls()
+        self.menu.onPerformanceChanged(self.getThreadPolicy())
+
+    # ------------------------- Property Setters and Getters ------------------------ #
+
+    def setPropertyAndApply(self, prop: str, value: Any):
+        super().setProperty(prop, value)
+        self.menu.onPerformanceChanged(self.getThreadPolicy())
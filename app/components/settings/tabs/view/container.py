@@ -19,6 +19,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from typing import Optional
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QColor, QFont
 from PyQt5.QtWidgets import QWidget
 
@@ -35,9 +36,33 @@ class ViewContainer(BaseSettings):
     def __init__(self, parent: QWidget, file=VIEW_CONFIG):
         super().__init__(parent, file)
         self._defaults = VIEW_DEFAULT
-        self._types = {"previewPadding": int, "selectionBorderThickness": int}
+        self._types = {
+            "previewPadding": int,
+            "selectionBorderThickness": int,
+            "freezeFrame": lambda value: str(value).lower() == "true",
+            "saveLog": lambda value: str(value).lower() == "true",
+        }
         self.loadSettings()
 
+        # Follow changes saved by the settings tab or made to the file
+        self._restylePending = False
+        self.settings.changed.connect(self.onSettingChanged)
+
+    def onSettingChanged(self, prop: str, value):
+        if prop not in self._defaults:
+            return
+        self.setProperty(
+            prop, self._defaults[prop] if value is None else value
+        )
+        # Several settings are saved at once, so restyle once after them
+        if not self._restylePending:
+            self._restylePending = True
+            QTimer.singleShot(0, self._restyle)
+
+    def _restyle(self):
+        self._restylePending = False
+        self.updateViewStyles()
+
     def getPreviewTextStyles(
         self, font: QFont, padding: int, color: QColor, background: QColor
     ):
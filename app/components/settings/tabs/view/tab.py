@@ -21,6 +21,7 @@ from typing import Any
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import (
+    QCheckBox,
     QGridLayout,
     QLabel,
     QPushButton,
@@ -110,9 +111,31 @@ class ViewSettingsTab(ViewContainer, BaseSettingsTab):
         )
         _windowColor.clicked.connect(lambda: self.getColor("windowColor"))
 
+        # --------------------------------- Capture --------------------------------- #
+
+        # Button Initializations
+        _captureTitle = QLabel("Capture ")
+        self._freezeFrame = QCheckBox("Freeze screen while snipping")
+        self._freezeFrame.setChecked(self.freezeFrame)
+        self._saveLog = QCheckBox("Save read text to a log file")
+        self._saveLog.setChecked(self.saveLog)
+
+        # Layout
+        self.layout().addWidget(_captureTitle, 2, 0, 1, 1)
+        self.layout().addWidget(self._freezeFrame, 2, 1, 1, 4)
+        self.layout().addWidget(self._saveLog, 2, 5, 1, -1)
+
+        # Signals and Slots
+        self._freezeFrame.toggled.connect(
+            lambda checked: self.setProperty("freezeFrame", checked)
+        )
+        self._saveLog.toggled.connect(
+            lambda checked: self.setProperty("saveLog", checked)
+        )
+
     def initPreview(self):
         self._preview = Preview(self)
-        self.layout().addWidget(self._preview, 2, 0, 1, -1)
+        self.layout().addWidget(self._preview, 3, 0, 1, -1)
         self.layout().setRowStretch(self.layout().rowCount() - 1, 1)
 
     # ----------------------------------- Settings ---------------------------------- #
@@ -120,6 +143,8 @@ class ViewSettingsTab(ViewContainer, BaseSettingsTab):
     def resetSettings(self):
         # Overridden to update styles on reset
         super().resetSettings()
+        self._freezeFrame.setChecked(self.freezeFrame)
+        self._saveLog.setChecked(self.saveLog)
         self.updateViewStyles()
 
     # ------------------------- Property Setters and Getters ------------------------ #
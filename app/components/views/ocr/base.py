@@ -17,21 +17,22 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from PyQt5.QtCore import (
-    QPoint,
-    QRect,
-    QSize,
-    QThreadPool,
-    QTimer,
-    Qt,
-    pyqtSlot,
-)
-from PyQt5.QtGui import QCursor, QPixmap
+import logging
+from math import ceil, floor
+
+from PyQt5.QtCore import QPoint, QRect, QSize, QTimer, Qt, pyqtSlot
+from PyQt5.QtGui import QCursor, QImage, QPixmap
 from PyQt5.QtWidgets import QApplication, QGraphicsView, QLabel, QWidget
 
 from components.misc import RubberBand
-from components.services import BaseWorker
-from utils.scripts import logText, pixmapToText
+from components.services import OCRScheduler
+from utils.change import ChangeDetector
+from utils.constants import OCR_DEBOUNCE_INTERVAL, OCR_FINAL_RESULT_TIMEOUT
+from utils.metrics import Metrics
+from utils.scripts import grabRegion, logText, pixmapToText
+from utils.tracing import tracer
+
+logger = logging.getLogger("cloe")
 
 
 class BaseOCRView(QGraphicsView):
@@ -39,11 +40,17 @@ class BaseOCRView(QGraphicsView):
     Base view with OCR capabilities
     """
 
+    # When enabled, the screen is captured once when the view is shown
+    # and every crop is taken from that frame instead of a fresh capture.
+    freezeFrame = False
+    # When enabled, read text is also appended to the text log
+    saveLog = False
+
     def __init__(self, parent: QWidget):
         super().__init__(parent)
 
         self._timer = QTimer()
-        self._timer.setInterval(300)
+        self._timer.setInterval(OCR_DEBOUNCE_INTERVAL)
         self._timer.setSingleShot(True)
         self._timer.timeout.connect(self.rubberBandStopped)
 
@@ -57,8 +64,37 @@ class BaseOCRView(QGraphicsView):
 
         self.pixmap = QPixmap()
 
+        self._scheduler = OCRScheduler(pixmapToText, parent=self)
+        self._scheduler.result.connect(self.ocrFinished)
+        self._requestedRect = QRect()
+        # Skips inference while the selection moves over blank background
+        self._changeDetector = ChangeDetector()
+        # Crops of this session only, the global metrics also count the
+        # crops of a watched region
+        self._sessionMetrics = Metrics()
+
         self.activeScreenIndex = 0
 
+    def resetSession(self):
+        """
+        Clears the selection and the OCR requests of the last session
+        """
+        self._timer.stop()
+        self.rubberBand.hide()
+        self._ocrText.hide()
+        self._requestedRect = QRect()
+        self._scheduler.reset()
+
+        crops = self._sessionMetrics.count("crops")
+        if crops:
+            logger.info(
+                "snip reused %d of %d crops as unchanged",
+                self._sessionMetrics.count("unchangedCrops"),
+                crops,
+            )
+        # Crops still in flight count towards the old session, not the next
+        self._sessionMetrics = Metrics()
+
     # ------------------------------------ Screen ----------------------------------- #
 
     def getActiveScreenIndex(self):
@@ -68,24 +104,88 @@ class BaseOCRView(QGraphicsView):
         return index
 
     def captureScreen(self, index: int):
+        """
+        Keeps a frame of the screen at its physical resolution
+        """
         screen = QApplication.screens()[index]
-        s = screen.size()
-        self.pixmap = screen.grabWindow(0).scaled(s.width(), s.height())
+        with tracer.span("captureScreen"):
+            self.pixmap = screen.grabWindow(0)
+        # The frame is painted at logical size and cropped in physical
+        # pixels, so there is no resample. The ratio is taken from the
+        # grab since platforms differ in whether they apply the scaling.
+        if not self.pixmap.isNull():
+            self.pixmap.setDevicePixelRatio(
+                self.pixmap.width() / screen.size().width()
+            )
+
+    def physicalRect(self, rect: QRect) -> QRect:
+        """
+        Maps a rect of the view to the pixels of the captured frame
+        """
+        ratio = self.pixmap.devicePixelRatio()
+        if ratio == 1:
+            return rect
+        left, top = floor(rect.x() * ratio), floor(rect.y() * ratio)
+        right = ceil((rect.x() + rect.width()) * ratio)
+        bottom = ceil((rect.y() + rect.height()) * ratio)
+        return QRect(left, top, right - left, bottom - top)
+
+    def logicalRect(self, rect: QRect) -> QRect:
+        """
+        Maps pixels of the captured frame to the smallest view rect covering them
+        """
+        ratio = self.pixmap.devicePixelRatio()
+        if ratio == 1:
+            return rect
+        left, top = floor(rect.x() / ratio), floor(rect.y() / ratio)
+        right = ceil((rect.x() + rect.width()) / ratio)
+        bottom = ceil((rect.y() + rect.height()) / ratio)
+        return QRect(left, top, right - left, bottom - top)
+
+    def captureRegion(self, rect: QRect) -> QImage:
+        """
+        Returns the pixels of a rect of the view, from the frozen frame if any
+        """
+        if self.freezeFrame:
+            return self.pixmap.copy(self.physicalRect(rect)).toImage()
+        screen = QApplication.screens()[self.activeScreenIndex]
+        with tracer.span("captureRegion"):
+            return grabRegion(screen, rect)
 
     @pyqtSlot()
     def rubberBandStopped(self):
-        if self._ocrText.isHidden():
-            self._ocrText.setText("")
-            self._ocrText.adjustSize()
-            self._ocrText.show()
-
-        self.captureScreen(self.activeScreenIndex)
-        pixmap = self.pixmap.copy(self.rubberBand.geometry())
-
-        worker = BaseWorker(pixmapToText, pixmap, self.parent().ocrModel)
-        worker.signals.result.connect(self.ocrFinished)
-        self._timer.timeout.disconnect(self.rubberBandStopped)
-        QThreadPool.globalInstance().start(worker)
+        with tracer.span("rubberBandStopped"):
+            if self._ocrText.isHidden():
+                self._ocrText.setText("")
+                self._ocrText.adjustSize()
+                self._ocrText.show()
+
+            self.requestOCR()
+
+    def requestOCR(self) -> int:
+        """
+        Queues OCR of the current selection and returns its generation
+        """
+        self._requestedRect = self.rubberBand.geometry()
+        # QPixmap is not safe to use outside the GUI thread,
+        # so the crop is handed off to the worker as a QImage.
+        image = self.captureRegion(self._requestedRect)
+        return self._scheduler.request(
+            image,
+            self.parent().ocrModel,
+            self.parent().ocrCache,
+            self._changeDetector,
+            history=self.parent().ocrHistory,
+            region=self.globalRegion(self._requestedRect),
+            sessionMetrics=self._sessionMetrics,
+        )
+
+    def globalRegion(self, rect: QRect) -> tuple[int, int, int, int]:
+        """
+        Returns the screen geometry (x, y, width, height) of a view rect
+        """
+        topLeft = self.mapToGlobal(rect.topLeft())
+        return topLeft.x(), topLeft.y(), rect.width(), rect.height()
 
     # ------------------------------------ Mouse ------------------------------------ #
 
@@ -106,12 +206,30 @@ class BaseOCRView(QGraphicsView):
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton:
+            self._timer.stop()
             self.rubberBand.setGeometry(
                 QRect(self._initialPoint, event.pos()).normalized()
             )
 
-            text = self._ocrText.text()
-            logText(text)
+            # Log the text of the final selection, not the preview,
+            # which may still belong to an earlier selection.
+            if self._requestedRect == self.rubberBand.geometry():
+                generation = self._scheduler.generation
+            else:
+                generation = self.requestOCR()
+            with tracer.span("waitForResult"):
+                text = self._scheduler.waitForResult(
+                    generation, OCR_FINAL_RESULT_TIMEOUT
+                )
+            if text is not None:
+                rect = self.rubberBand.geometry()
+                logText(
+                    text,
+                    saveLog=self.saveLog,
+                    region=QRect(
+                        self.mapToGlobal(rect.topLeft()), rect.size()
+                    ),
+                )
             self.rubberBand.hide()
             self._ocrText.hide()
 
@@ -125,10 +243,11 @@ class BaseOCRView(QGraphicsView):
         self.rubberBand.hide()
         return super().closeEvent(event)
 
-    def ocrFinished(self, text):
-        try:
-            self._ocrText.setText(text)
-            self._ocrText.adjustSize()
-            self._timer.timeout.connect(self.rubberBandStopped)
-        except Exception as e:
-            print(e)
+    @pyqtSlot(int, str)
+    def ocrFinished(self, generation: int, text: str):
+        with tracer.span("ocrFinished"):
+            try:
+                self._ocrText.setText(text)
+                self._ocrText.adjustSize()
+            except Exception as e:
+                print(e)
@@ -17,18 +17,41 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QColor, QMouseEvent
-from PyQt5.QtWidgets import QWidget
+import logging
+import time
+from typing import Optional
 
+from PyQt5.QtCore import QPoint, QRect, QThreadPool, Qt
+from PyQt5.QtGui import (
+    QColor,
+    QKeyEvent,
+    QMouseEvent,
+    QPainter,
+    QPaintEvent,
+    QPixmap,
+)
+from PyQt5.QtWidgets import QLabel, QWidget
+
+from components.misc import RubberBand
+from components.services import InferenceWorker
 from components.settings import ViewContainer
 from .base import BaseOCRView
-from utils.scripts import colorToRGBA
+from utils.metrics import metrics
+from utils.scripts import colorToRGBA, logText, pageToText, pixmapsToText
+from utils.tracing import tracer
+
+logger = logging.getLogger("cloe")
 
 
 class FullScreenView(BaseOCRView, ViewContainer):
     """
     Fullscreen view with OCR capabilities
+
+    Holding Ctrl while releasing a selection keeps it as one of several
+    regions. Pressing Enter reads all regions in a single batch. readPage
+    finds the regions of the whole frame and reads them the same way.
+    Holding Shift while releasing a selection watches it after the view
+    closes, reading it again whenever its content changes.
     """
 
     def __init__(self, parent: QWidget):
@@ -38,12 +61,224 @@ class FullScreenView(BaseOCRView, ViewContainer):
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
-        self.updateViewStyles(self)
+        self._regions: list[QRect] = []
+        self._regionWidgets: list[QWidget] = []
+        self._readingRegions = False
+        # Counts the snipping sessions, so that results of an earlier one
+        # are not shown over a new frame
+        self._session = 0
+
+        self.updateViewStyles()
 
     def setBackgroundColor(self, color: QColor):
+        self._backgroundColor = color
         self.setStyleSheet(f"background-color: {colorToRGBA(color)}")
 
+    def paintEvent(self, event: QPaintEvent):
+        if self.freezeFrame and not self.pixmap.isNull():
+            # Show the frozen frame with the window color on top,
+            # in place of the translucent background.
+            painter = QPainter(self.viewport())
+            painter.drawPixmap(0, 0, self.pixmap)
+            painter.fillRect(event.rect(), self._backgroundColor)
+            painter.end()
+        output = super().paintEvent(event)
+        self.parent().onOverlayPainted()
+        return output
+
+    def resetSession(self):
+        """
+        Clears the selection, regions and frame of the last snipping session
+        """
+        super().resetSession()
+        self._session += 1
+        for widget in self._regionWidgets:
+            widget.deleteLater()
+        self._regions = []
+        self._regionWidgets = []
+        self._readingRegions = False
+        # Release the frame, a fresh one is captured on the next show
+        self.pixmap = QPixmap()
+
+    def updateViewStyles(self, view: Optional[QWidget] = None):
+        # Overridden to style this view by default
+        super().updateViewStyles(view or self)
+
+    # ----------------------------------- Regions ----------------------------------- #
+
+    def addRegion(self, rect: QRect):
+        """
+        Keeps the selection as a region to be read with the others
+        """
+        self._timer.stop()
+        self.rubberBand.hide()
+        self._ocrText.hide()
+        self.showRegion(rect)
+        self._regions.append(rect)
+
+    def showRegion(self, rect: QRect):
+        """
+        Outlines a region on the overlay until the session ends
+        """
+        band = RubberBand(self.parent())
+        band.setFill(self.selectionBackground)
+        band.setBorder(
+            self.selectionBorderColor, self.selectionBorderThickness
+        )
+        band.setGeometry(rect)
+        band.show()
+        self._regionWidgets.append(band)
+
+    def readRegions(self):
+        """Reads every kept region with one batched model pass
+
+        The regions are taken out of the view, so that regions added while
+        the batch is read are kept for the next one.
+        """
+        regions, self._regions = self._regions, []
+        images = [self.captureRegion(rect) for rect in regions]
+        session = self._session
+
+        worker = InferenceWorker(
+            pixmapsToText,
+            images,
+            self.parent().ocrModel,
+            self.parent().ocrCache,
+            history=self.parent().ocrHistory,
+            regions=[self.globalRegion(rect) for rect in regions],
+        )
+
+        def finished(texts: list[str]):
+            # A new session reset the flag already
+            if session == self._session:
+                self._readingRegions = False
+            self.regionsFinished(session, regions, texts)
+
+        worker.signals.result.connect(finished)
+        self._readingRegions = True
+        QThreadPool.globalInstance().start(worker)
+
+    def regionsFinished(
+        self, session: int, regions: list[QRect], texts: list[str]
+    ):
+        if session != self._session:
+            return
+        for rect, text in zip(regions, texts):
+            label = QLabel(text, self.parent())
+            label.setObjectName("previewText")
+            label.setWordWrap(True)
+            label.setMaximumWidth(max(rect.width(), 200))
+            label.move(rect.bottomLeft())
+            label.adjustSize()
+            label.show()
+            self._regionWidgets.append(label)
+        region = QRect()
+        for rect in regions:
+            region = region.united(rect)
+        logText(
+            "\n".join(text for text in texts if text),
+            saveLog=self.saveLog,
+            region=QRect(self.mapToGlobal(region.topLeft()), region.size()),
+        )
+
+    # ------------------------------------- Page ------------------------------------ #
+
+    def readPage(self, requestedAt: Optional[float] = None):
+        """Finds the text regions of the captured frame and reads them
+
+        Args:
+            requestedAt (float, optional): time.perf_counter() of the request,
+            to report the time until the results are shown. Defaults to now.
+        """
+        requestedAt = requestedAt or time.perf_counter()
+        origin = self.mapToGlobal(QPoint(0, 0))
+        session = self._session
+        worker = InferenceWorker(
+            pageToText,
+            self.pixmap.toImage(),
+            self.parent().ocrModel,
+            self.parent().ocrCache,
+            history=self.parent().ocrHistory,
+            origin=(origin.x(), origin.y()),
+            scale=self.pixmap.devicePixelRatio(),
+        )
+        worker.signals.result.connect(
+            lambda result: self.pageFinished(session, result, requestedAt)
+        )
+        QThreadPool.globalInstance().start(worker)
+
+    def pageFinished(
+        self,
+        session: int,
+        result: tuple[list[QRect], list[str]],
+        requestedAt: float,
+    ):
+        if session != self._session:
+            return
+        rects, texts = result
+        # Regions are found in the pixels of the frame
+        rects = [self.logicalRect(rect) for rect in rects]
+        # Regions without text are most likely artwork
+        found = [(rect, text) for rect, text in zip(rects, texts) if text]
+        # Kept apart from the regions drawn with Ctrl, which are read on Enter
+        for rect, _ in found:
+            self.showRegion(rect)
+        self.regionsFinished(
+            session, [rect for rect, _ in found], [text for _, text in found]
+        )
+
+        now = time.perf_counter()
+        tracer.add("read page", requestedAt, now)
+        elapsed = (now - requestedAt) * 1000
+        metrics.record("pageLatency", elapsed)
+        logger.info(
+            "read %d of %d page regions in %.0f ms",
+            len(found),
+            len(rects),
+            elapsed,
+        )
+
+    # ------------------------------------ Events ----------------------------------- #
+
+    def keyPressEvent(self, event: QKeyEvent):
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            # One batch at a time, the next Enter reads the regions added
+            # meanwhile
+            if self._regions and not self._readingRegions:
+                self.readRegions()
+        elif event.key() == Qt.Key_Escape:
+            self.parent().close()
+        return super().keyPressEvent(event)
+
     def mouseReleaseEvent(self, event: QMouseEvent):
+        if (
+            event.button() == Qt.LeftButton
+            and event.modifiers() & Qt.ControlModifier
+        ):
+            rect = QRect(self._initialPoint, event.pos()).normalized()
+            # Ignore Ctrl+clicks that did not drag a region
+            if min(rect.width(), rect.height()) > 2:
+                self.addRegion(rect)
+            return
+
+        if (
+            event.button() == Qt.LeftButton
+            and event.modifiers() & Qt.ShiftModifier
+        ):
+            rect = QRect(self._initialPoint, event.pos()).normalized()
+            if min(rect.width(), rect.height()) > 2:
+                self.parent().systemTray.watchRegion(
+                    self.activeScreenIndex, rect
+                )
+            self.parent().close()
+            return
+
+        if self._regionWidgets:
+            # Regions were drawn in this session, so a plain click
+            # dismisses their results instead of reading a new selection.
+            self.parent().close()
+            return
+
         BaseOCRView.mouseReleaseEvent(self, event)
         # Ensure that parent is closed
         self.parent().close()
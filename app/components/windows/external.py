@@ -17,21 +17,30 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from typing import TYPE_CHECKING
+import logging
+import time
+from typing import TYPE_CHECKING, Optional
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QCloseEvent, QCursor
 from PyQt5.QtWidgets import QApplication, QDesktopWidget, QMainWindow
 
 from components.views import FullScreenView
+from utils.metrics import metrics
+from utils.tracing import tracer
 
 if TYPE_CHECKING:
     from .tray import SystemTray
 
+logger = logging.getLogger("cloe")
+
 
 class ExternalWindow(QMainWindow):
     """
     External window widget to enclose FullScreenView
+
+    The window is built once and hidden between snips. Closing it only
+    resets the state of the snipping session.
     """
 
     def __init__(self, parent: "SystemTray"):
@@ -43,9 +52,18 @@ class ExternalWindow(QMainWindow):
         self.layout().setContentsMargins(0, 0, 0, 0)
         self.setStyleSheet("border:0px; margin:0px")
 
-        # Enables the widget to have a transparent background.
-        self.setAttribute(Qt.WA_NoSystemBackground)
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setCentralWidget(FullScreenView(self))
+        self.ocrCache = parent.ocrCache
+        self.ocrHistory = parent.ocrHistory
+        # Time of the request to show, until the overlay is painted
+        self._showRequestedAt: Optional[float] = None
+
+        # A frozen frame is painted by the view, so the window only needs
+        # to be translucent when showing the live screen underneath.
+        if not self.centralWidget().freezeFrame:
+            # Enables the widget to have a transparent background.
+            self.setAttribute(Qt.WA_NoSystemBackground)
+            self.setAttribute(Qt.WA_TranslucentBackground)
 
         # FramelessWindowHint flag also enables transparent background.
         # WindowStaysOnTopHint & Popup flags ensures that the widget is the top window.
@@ -53,10 +71,56 @@ class ExternalWindow(QMainWindow):
             Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Popup
         )
 
-        self.setCentralWidget(FullScreenView(self))
-        self.ocrModel = parent.ocrModel
-
-    def showFullScreen(self):
+    @property
+    def ocrModel(self):
+        # The window outlives model (re)loads, so always ask the tray
+        return self.systemTray.ocrModel
+
+    def prepare(self):
+        """
+        Creates the native window and polishes the styles ahead of the first snip
+        """
+        self.winId()
+        self.ensurePolished()
+        self.centralWidget().ensurePolished()
+
+    def showFullScreen(
+        self, requestedAt: Optional[float] = None, capture: bool = False
+    ):
+        """Shows the overlay on the active screen
+
+        Args:
+            requestedAt (float, optional): time.perf_counter() of the request,
+            such as the hotkey press, to measure the latency until the
+            overlay is painted. Defaults to now.
+            capture (bool, optional): Capture the screen even if frames are
+            not frozen. Defaults to False.
+        """
+        self._showRequestedAt = requestedAt or time.perf_counter()
+        with tracer.span("ExternalWindow.showFullScreen"):
+            return self._showFullScreen(capture)
+
+    def readPage(self, requestedAt: Optional[float] = None):
+        """
+        Shows the overlay and reads every text region of the active screen
+        """
+        requestedAt = requestedAt or time.perf_counter()
+        self.showFullScreen(requestedAt, capture=True)
+        self.centralWidget().readPage(requestedAt)
+
+    def onOverlayPainted(self):
+        if self._showRequestedAt is None:
+            return
+        now = time.perf_counter()
+        tracer.add("overlay latency", self._showRequestedAt, now)
+        latency = (now - self._showRequestedAt) * 1000
+        self._showRequestedAt = None
+        if metrics.record("overlayLatency", latency) == 1:
+            logger.info(
+                "first overlay shown %.0f ms after the request", latency
+            )
+
+    def _showFullScreen(self, capture: bool):
         # Overridden to show on the active screen
         fullscreen: FullScreenView = self.centralWidget()
         screenIndex = fullscreen.getActiveScreenIndex()
@@ -66,14 +130,20 @@ class ExternalWindow(QMainWindow):
         screen = QDesktopWidget().screenGeometry(screenIndex)
         self.move(screen.left(), screen.top())
 
+        # Capture before showing so that the overlay is not in the frame
+        if fullscreen.freezeFrame or capture:
+            fullscreen.captureScreen(screenIndex)
+
         QApplication.setOverrideCursor(QCursor(Qt.CrossCursor))
+        # Receive Enter/Escape without clicking the overlay first
+        fullscreen.setFocus()
 
         return super().showFullScreen()
 
     def closeEvent(self, event: QCloseEvent):
-        # Ensure that object is deleted before closing
-        self.deleteLater()
-        self.systemTray.externalWindow = None
+        # Kept for the next snip, closing only hides the window
+        self.centralWidget().resetSession()
+        self._showRequestedAt = None
         # Restore cursor
         QApplication.restoreOverrideCursor()
         return super().closeEvent(event)
@@ -0,0 +1,112 @@
+"""
+Cloe History Window
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import time
+
+from PyQt5.QtGui import QGuiApplication
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from utils.constants import HISTORY_SEARCH_LIMIT
+from utils.history import OCRHistory
+
+
+class HistoryWindow(QWidget):
+    """
+    Searchable list of the texts read so far
+    """
+
+    def __init__(self, history: OCRHistory):
+        super().__init__()
+        self.history = history
+        self.setWindowTitle("History")
+
+        self._search = QLineEdit()
+        self._search.setPlaceholderText("Search")
+        self._search.setClearButtonEnabled(True)
+
+        self._table = QTableWidget(0, 4)
+        self._table.setHorizontalHeaderLabels(
+            ["Time", "Text", "Region", "Latency"]
+        )
+        self._table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self._table.verticalHeader().hide()
+        header = self._table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+
+        self._status = QLabel()
+
+        self.setLayout(QVBoxLayout(self))
+        self.layout().addWidget(self._search)
+        self.layout().addWidget(self._table)
+        self.layout().addWidget(self._status)
+        self.resize(625, 400)
+
+        # Signals and Slots
+        self._search.textChanged.connect(self.search)
+        self._table.cellDoubleClicked.connect(self.copyText)
+
+    def showEvent(self, event):
+        self.search(self._search.text())
+        super().showEvent(event)
+
+    def search(self, query: str):
+        start = time.perf_counter()
+        entries = self.history.search(query, HISTORY_SEARCH_LIMIT)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self._table.setRowCount(len(entries))
+        for row, entry in enumerate(entries):
+            when = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(entry.time)
+            )
+            region = (
+                f"{entry.width}x{entry.height} at ({entry.x}, {entry.y})"
+                if entry.x is not None
+                else ""
+            )
+            # Texts reused from an earlier read are recorded without latency
+            latency = f"{entry.latency:.0f} ms" if entry.latency else "reused"
+            cells = [when, entry.text, region, latency]
+            for column, value in enumerate(cells):
+                item = QTableWidgetItem(value)
+                if column == 1:
+                    item.setToolTip(value)
+                self._table.setItem(row, column, item)
+
+        self._status.setText(
+            f"{len(entries)} of {self.history.count()} entries "
+            f"({elapsed:.0f} ms). Double-click a row to copy its text."
+        )
+
+    def copyText(self, row: int, column: int):
+        item = self._table.item(row, 1)
+        if item is not None:
+            QGuiApplication.clipboard().setText(item.text())
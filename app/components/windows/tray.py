@@ -17,35 +17,114 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from manga_ocr import MangaOcr
-from PyQt5.QtCore import QObject, QSettings, QThreadPool
+import logging
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import (
+    QObject,
+    QRect,
+    QThreadPool,
+    QTimer,
+    Qt,
+    pyqtSignal,
+)
 from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QApplication, QMenu, QSystemTrayIcon
+from PyQt5.QtWidgets import (
+    QApplication,
+    QFileDialog,
+    QMenu,
+    QSystemTrayIcon,
+)
 
 from .external import ExternalWindow
+from .history import HistoryWindow
 from components.popups import AboutPopup
-from components.services import BaseWorker, Hotkeys
+from components.services import (
+    Hotkeys,
+    InferenceWorker,
+    RegionWatcher,
+    SettingsStore,
+)
 from components.settings import SettingsMenu
+from utils.cache import OCRCache
 from utils.constants import (
     ABOUT_ICON,
     APP_LOGO,
+    CACHE_FILE,
+    CACHE_MEMORY_BUDGET,
+    CACHE_PERCEPTUAL,
     EXIT_ICON,
+    HISTORY_FILE,
     HOTKEY_CONFIG,
+    HOTKEY_DEFAULT,
+    INFERENCE_SLOT_SIZE,
+    INFERENCE_SLOTS,
+    MODEL_WARMUP_ROUNDS,
+    MODEL_WARMUP_SIZES,
+    PERFORMANCE_CONFIG,
+    PERFORMANCE_DEFAULT,
     SETTINGS_ICON,
+    UNMAPPED_KEY,
+    VALID_KEY_LIST,
+    VIEW_CONFIG,
+    VIEW_DEFAULT,
 )
+from utils.history import OCRHistory
+from utils.inference import RemoteModel
+from utils.scripts import loadModel, warmUpModel
+from utils.threads import threadPolicy
+from utils.timeline import startupTimeline
+from utils.tracing import tracer
+from utils.writer import textLog
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+logger = logging.getLogger("cloe")
+
+
+class ModelState(Enum):
+    UNLOADED = "Not loaded"
+    LOADING = "Loading"
+    WARMING = "Warming up"
+    READY = "Ready"
+    ERROR = "Error"
 
 
 class SystemTray(QSystemTrayIcon):
     """
     System tray application containing all global actions
+
+    Signals:
+        modelStateChanged: Emit the new ModelState of the OCR model
     """
 
+    modelStateChanged = pyqtSignal(object)
+
     def __init__(self, parent=None):
         super().__init__(QIcon(APP_LOGO), parent)
 
         # State trackers and configurations
         self.threadpool = QThreadPool()
-        self.ocrModel: MangaOcr = None
+        self.ocrModel: "MangaOcr" = None
+        self.modelState = ModelState.UNLOADED
+        self.modelStateChanged.connect(self.onModelStateChanged)
+        self.ocrCache = OCRCache(
+            CACHE_MEMORY_BUDGET, CACHE_FILE, perceptual=CACHE_PERCEPTUAL
+        )
+        self.ocrHistory = OCRHistory(HISTORY_FILE)
+
+        # Settings are read from memory and followed for changes
+        self.hotkeySettings = SettingsStore.forFile(HOTKEY_CONFIG)
+        self.viewSettings = SettingsStore.forFile(VIEW_CONFIG)
+        self.performanceSettings = SettingsStore.forFile(PERFORMANCE_CONFIG)
+        self.hotkeySettings.changed.connect(self.onHotkeySettingChanged)
+        self.viewSettings.changed.connect(self.onViewSettingChanged)
+        self.performanceSettings.changed.connect(
+            self.onPerformanceSettingChanged
+        )
+        self._hotkeysPending = False
         self.loadHotkeys()
 
         # Menu
@@ -54,16 +133,33 @@ class SystemTray(QSystemTrayIcon):
 
         # Menu Actions
         menu.addAction(QIcon(SETTINGS_ICON), "Settings", self.openSettings)
+        menu.addAction("History", self.openHistory)
+        self.stopWatchingAction = menu.addAction(
+            "Stop watching", self.stopWatching
+        )
+        self.stopWatchingAction.setEnabled(False)
+        menu.addSeparator()
+        traceAction = menu.addAction("Trace snips", self.toggleTracing)
+        traceAction.setCheckable(True)
+        menu.addAction("Export trace", self.exportTrace)
         menu.addSeparator()
         menu.addAction(QIcon(ABOUT_ICON), "About Chloe", self.openAbout)
         menu.addAction(QIcon(EXIT_ICON), "Exit", self.closeApplication)
 
-        self.externalWindow = None
+        self.externalWindow: ExternalWindow = None
         self.settingsMenu = None
+        self.historyWindow = None
+        self.regionWatcher: RegionWatcher = None
+        self._hotkeyPressedAt = None
+        # Built once the event loop runs, after the app stylesheet is set
+        QTimer.singleShot(0, self.prepareCapture)
 
-    def processGlobalHotkey(self, objectMethod: tuple[QObject, str]):
-        obj, fn = objectMethod
-        getattr(obj, fn)()
+    def processGlobalHotkey(self, objectMethod: tuple[QObject, str, float]):
+        obj, fn, pressedAt = objectMethod
+        self._hotkeyPressedAt = pressedAt
+        with tracer.span("SystemTray.processGlobalHotkey"):
+            getattr(obj, fn)()
+        self._hotkeyPressedAt = None
 
     def loadHotkeys(self):
         try:
@@ -73,62 +169,256 @@ class SystemTray(QSystemTrayIcon):
         self.hotkeys = Hotkeys(self.getHotkeys())
         self.hotkeys.start()
         self.hotkeys.signals.result.connect(self.processGlobalHotkey)
+        if "hotkeys live" not in startupTimeline.marks:
+            startupTimeline.mark("hotkeys live")
+
+    def onHotkeySettingChanged(self, key: str, value):
+        # A save changes several keys, so restart the listener once
+        if key == "hotkeys" and not self._hotkeysPending:
+            self._hotkeysPending = True
+            QTimer.singleShot(0, self._reloadHotkeys)
+
+    def _reloadHotkeys(self):
+        self._hotkeysPending = False
+        self.loadHotkeys()
 
     def getHotkeys(self):
         hotkeyDict = {}
-        hotkeySettings = QSettings(HOTKEY_CONFIG, QSettings.IniFormat)
-        hotkeys = hotkeySettings.value("hotkeys")
-        if hotkeys:
-            for action, hotkey in hotkeys.items():
-                if hotkey:
-                    hotkeyDict[hotkey] = (self, action)
-        elif not hotkeys:
-            hotkeyDict["<Alt>+Q"] = (self, "startCapture")
+        hotkeys = self.hotkeySettings.value("hotkeys") or {}
+        for action, hotkey in hotkeys.items():
+            if hotkey:
+                hotkeyDict[hotkey] = (self, action)
+        # Actions that were never saved, such as ones added after the
+        # hotkeys were first saved, get their default unless it is taken
+        for action, default in HOTKEY_DEFAULT.items():
+            hotkey = self.defaultHotkey(default)
+            if hotkey and action not in hotkeys and hotkey not in hotkeyDict:
+                hotkeyDict[hotkey] = (self, action)
         return hotkeyDict
 
+    @staticmethod
+    def defaultHotkey(default: dict) -> str:
+        """
+        Returns the hotkey text of a HOTKEY_DEFAULT entry, empty if unmapped
+        """
+        key = VALID_KEY_LIST[int(default["mainKey"])]
+        if key == UNMAPPED_KEY:
+            return ""
+        modifiers = [
+            f"<{name}>+"
+            for name, prop in (
+                ("Shift", "shiftKey"),
+                ("Ctrl", "ctrlKey"),
+                ("Alt", "altKey"),
+            )
+            if default[prop] == "true"
+        ]
+        return "".join(modifiers) + key
+
+    def setModelState(self, state: ModelState):
+        # May be called from the model-loading worker thread
+        self.modelState = state
+        self.modelStateChanged.emit(state)
+
+    def onModelStateChanged(self, state: ModelState):
+        self.setToolTip(f"Cloe - MangaOCR model: {state.value}")
+
+    def getPerformanceSetting(self, prop: str) -> str:
+        value = self.performanceSettings.value(prop, PERFORMANCE_DEFAULT[prop])
+        return str(value).lower()
+
+    def getThreadPolicy(self) -> dict:
+        policy = {}
+        for prop in ("intraOpThreads", "interOpThreads", "reservedCores"):
+            policy[prop] = int(self.getPerformanceSetting(prop))
+        for prop in ("cpuAffinity", "lowPriority"):
+            policy[prop] = self.getPerformanceSetting(prop) == "true"
+        return policy
+
+    def applyThreadPolicy(self, policy: dict):
+        # The inference process applies the policy to all of its threads,
+        # otherwise the next model task applies it to its thread and to the
+        # threads torch started
+        if isinstance(self.ocrModel, RemoteModel):
+            self.ocrModel.setThreadPolicy(policy)
+        else:
+            threadPolicy.update(**policy)
+
     def loadModel(self):
         def loadModelHelper():
             try:
                 self.showMessage(
                     "Please wait", "Loading the MangaOCR model ..."
                 )
-                self.ocrModel = MangaOcr()
+                self.setModelState(ModelState.LOADING)
+                engine = self.getPerformanceSetting("engine")
+                policy = self.getThreadPolicy()
+                if self.getPerformanceSetting("inferenceProcess") == "true":
+                    self.ocrModel = RemoteModel(
+                        INFERENCE_SLOTS, INFERENCE_SLOT_SIZE, engine, policy
+                    )
+                else:
+                    self.ocrModel = loadModel(engine)
+                    threadPolicy.update(**policy)
+                startupTimeline.mark("model loaded")
+                logger.info("model engine: %s", engine)
+
+                self.setModelState(ModelState.WARMING)
+                duration = warmUpModel(
+                    self.ocrModel, MODEL_WARMUP_SIZES, MODEL_WARMUP_ROUNDS
+                )
+                logger.info("model warm-up took %.0f ms", duration)
                 return "success"
             except Exception as e:
                 return str(e)
 
         def loadModelConfirm(message: str):
             if message.lower() == "success":
+                self.setModelState(ModelState.READY)
+                startupTimeline.mark("model ready")
+                logger.info("startup timeline: %s", startupTimeline.summary())
                 self.showMessage(
                     "MangaOCR model loaded",
                     "You are now using the MangaOCR model for Japanese text detection.",
                 )
             else:
+                self.setModelState(ModelState.ERROR)
                 self.showMessage("Load Model Error", message)
 
-        worker = BaseWorker(loadModelHelper)
+        worker = InferenceWorker(loadModelHelper)
         worker.signals.result.connect(loadModelConfirm)
         self.threadpool.start(worker)
 
     def startCapture(self):
-        if self.ocrModel == None:
+        if not self.isModelReady():
+            return
+        if self.externalWindow is None:
+            self.prepareCapture()
+        if not self.externalWindow.isVisible():
+            self.externalWindow.showFullScreen(self._hotkeyPressedAt)
+
+    def readPage(self):
+        if not self.isModelReady():
+            return
+        if self.externalWindow is None:
+            self.prepareCapture()
+        if not self.externalWindow.isVisible():
+            self.externalWindow.readPage(self._hotkeyPressedAt)
+
+    def isModelReady(self) -> bool:
+        """
+        Tells the user to wait if the model is not loaded yet
+        """
+        if self.modelState != ModelState.READY:
             self.showMessage(
                 "MangaOCR model not yet loaded",
-                "Please wait until the MangaOCR model is loaded.",
+                "Please wait until the MangaOCR model is loaded "
+                f"(current state: {self.modelState.value}).",
             )
-            return
-        if self.externalWindow is None:
+            return False
+        return True
+
+    def prepareCapture(self):
+        """
+        Builds the snipping window ahead of time, it is reused by every snip
+        """
+        with tracer.span("ExternalWindow.__init__"):
             self.externalWindow = ExternalWindow(self)
-        if not self.externalWindow.isVisible():
-            self.externalWindow.showFullScreen()
+            self.externalWindow.prepare()
+
+    def watchRegion(self, screenIndex: int, rect: QRect):
+        """Reads a region of a screen again whenever its content changes
+
+        Args:
+            screenIndex (int): Index of the screen in QApplication.screens().
+            rect (QRect): Region in logical pixels relative to the screen.
+        """
+        self.stopWatching()
+        saveLog = self.viewSettings.value("saveLog", VIEW_DEFAULT["saveLog"])
+        self.regionWatcher = RegionWatcher(
+            QApplication.screens()[screenIndex],
+            rect,
+            int(self.getPerformanceSetting("watchInterval")),
+            str(saveLog).lower() == "true",
+            parent=self,
+        )
+        self.regionWatcher.start()
+        self.stopWatchingAction.setEnabled(True)
+
+    def stopWatching(self):
+        if self.regionWatcher is None:
+            return
+        self.regionWatcher.stop()
+        self.regionWatcher.deleteLater()
+        self.regionWatcher = None
+        self.stopWatchingAction.setEnabled(False)
+
+    def onPerformanceSettingChanged(self, key: str, value):
+        if key == "watchInterval" and self.regionWatcher is not None:
+            self.regionWatcher.setInterval(
+                int(self.getPerformanceSetting("watchInterval"))
+            )
+
+    def onViewSettingChanged(self, key: str, value):
+        if key == "saveLog" and self.regionWatcher is not None:
+            if value is None:
+                value = VIEW_DEFAULT["saveLog"]
+            self.regionWatcher.saveLog = str(value).lower() == "true"
+            return
+
+        # The view restyles itself, but translucency is fixed when the
+        # native window is created, so the window is rebuilt for freezeFrame
+        window = self.externalWindow
+        if key != "freezeFrame" or window is None:
+            return
+        if value is None:
+            value = VIEW_DEFAULT["freezeFrame"]
+        freezeFrame = str(value).lower() == "true"
+        if window.testAttribute(Qt.WA_TranslucentBackground) == freezeFrame:
+            if window.isVisible():
+                window.close()
+            window.deleteLater()
+            self.prepareCapture()
+
+    def toggleTracing(self, checked: bool):
+        tracer.enabled = checked
+
+    def exportTrace(self):
+        path, _ = QFileDialog.getSaveFileName(
+            None, "Export trace", "cloe-trace.json", "Trace (*.json)"
+        )
+        if not path:
+            return
+        try:
+            count = tracer.export(path)
+            self.showMessage(
+                "Trace exported",
+                f"Saved {count} spans. Open the file in ui.perfetto.dev "
+                "or chrome://tracing.",
+            )
+        except Exception as e:
+            self.showMessage("Export Trace Error", str(e))
 
     def openSettings(self):
         if self.settingsMenu is None:
             self.settingsMenu = SettingsMenu(self)
         self.settingsMenu.show()
 
+    def openHistory(self):
+        if self.historyWindow is None:
+            self.historyWindow = HistoryWindow(self.ocrHistory)
+        self.historyWindow.show()
+        self.historyWindow.activateWindow()
+
     def openAbout(self):
         AboutPopup().exec()
 
     def closeApplication(self):
+        self.stopWatching()
+        SettingsStore.flushAll()
+        textLog.close()
+        self.ocrCache.close()
+        self.ocrHistory.close()
+        if isinstance(self.ocrModel, RemoteModel):
+            self.ocrModel.close()
         QApplication.instance().exit()
@@ -17,16 +17,28 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import logging
+import multiprocessing
 import sys
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication
 
+# Imported first so that the startup timeline also covers the imports below
+from utils.timeline import startupTimeline
 from components.windows import SystemTray
 from utils.constants import APP_LOGO, APP_NAME, STYLESHEET_DEFAULT
 
 if __name__ == "__main__":
 
+    # Required by the inference process in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    startupTimeline.mark("imports done")
+
     app = QApplication(sys.argv)
     app.setApplicationName(APP_NAME)
     app.setWindowIcon(QIcon(APP_LOGO))
@@ -39,6 +51,8 @@ if __name__ == "__main__":
         app.setStyleSheet(fh.read())
 
     widget.show()
+    # Runs once the event loop has shown the tray icon
+    QTimer.singleShot(0, lambda: startupTimeline.mark("tray visible"))
     widget.loadModel()
     app.exec_()
     sys.exit()
@@ -0,0 +1,54 @@
+"""
+Cloe Bubble Tests
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+
+import numpy as np
+import pytest
+
+from utils.bubbles import findTextRegions
+
+# Byte offsets of blue, green and red in a 32-bit RGB pixel
+_BGR = (0, 1, 2) if sys.byteorder == "little" else (3, 2, 1)
+
+
+def makePage(color: tuple[int, int, int]) -> np.ndarray:
+    """
+    Returns a white page with one column of strokes in the color (r, g, b)
+    """
+    page = np.full((400, 400, 4), 255, np.uint8)
+    for x in range(160, 220, 8):
+        for y in range(150, 240, 10):
+            for offset, value in zip(_BGR, reversed(color)):
+                page[y : y + 6, x : x + 3, offset] = value
+    return page
+
+
+@pytest.mark.parametrize(
+    "color",
+    [(0, 0, 0), (0, 200, 0), (200, 0, 200), (0, 0, 255)],
+    ids=["black", "green", "magenta", "blue"],
+)
+def test_findTextRegions_finds_colored_text(color):
+    regions = findTextRegions(makePage(color))
+    assert len(regions) == 1
+    x, y, w, h = regions[0]
+    assert x <= 160 and x + w >= 219
+    assert y <= 150 and y + h >= 236
@@ -0,0 +1,190 @@
+"""
+Cloe Capture Tests
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import sys
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor, QImage, QPixmap, QScreen
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from components.views import FullScreenView
+
+RATIOS = (1, 1.5, 2)
+# Byte offsets of red and green in a 32-bit RGB pixel
+_RED, _GREEN = (2, 1) if sys.byteorder == "little" else (1, 2)
+
+
+def makeFrame(width: int, height: int) -> QImage:
+    """
+    Returns a physical frame whose pixels encode their coordinates
+    """
+    pixels = np.zeros((height, width, 4), np.uint8)
+    pixels[..., _RED] = np.arange(width) % 256
+    pixels[..., _GREEN] = (np.arange(height) % 256)[:, None]
+    frame = QImage(
+        pixels.data, width, height, width * 4, QImage.Format_RGB32
+    ).copy()
+    return frame
+
+
+@pytest.fixture(params=RATIOS, ids=lambda ratio: f"dpr{ratio}")
+def ratio(request, qapp, monkeypatch) -> float:
+    """
+    Stubs QScreen.grabWindow with a screen scaled by the ratio
+    """
+    screen = qapp.primaryScreen().size()
+    frame = makeFrame(
+        round(screen.width() * request.param),
+        round(screen.height() * request.param),
+    )
+
+    def grabWindow(self, window=0, x=0, y=0, width=-1, height=-1):
+        if width < 0:
+            return QPixmap.fromImage(frame)
+        scale = request.param
+        return QPixmap.fromImage(
+            frame.copy(
+                round(x * scale),
+                round(y * scale),
+                round(width * scale),
+                round(height * scale),
+            )
+        )
+
+    monkeypatch.setattr(QScreen, "grabWindow", grabWindow)
+    return request.param
+
+
+@pytest.fixture
+def view(qapp) -> FullScreenView:
+    parent = QWidget()
+    view = FullScreenView(parent)
+    parent.show()
+    yield view
+    parent.hide()
+    parent.deleteLater()
+
+
+def test_captureScreen_keeps_physical_frame(view, ratio):
+    view.captureScreen(0)
+    screen = QApplication.primaryScreen().size()
+    assert view.pixmap.devicePixelRatio() == pytest.approx(ratio)
+    assert view.pixmap.width() == round(screen.width() * ratio)
+    assert view.pixmap.height() == round(screen.height() * ratio)
+
+
+@pytest.mark.parametrize(
+    "rect",
+    [QRect(0, 0, 10, 10), QRect(1, 1, 3, 3), QRect(7, 3, 5, 9)],
+    ids=str,
+)
+def test_physicalRect_covers_selection(view, ratio, rect):
+    view.captureScreen(0)
+    physical = view.physicalRect(rect)
+    assert physical.x() <= rect.x() * ratio
+    assert physical.y() <= rect.y() * ratio
+    assert physical.right() + 1 >= (rect.right() + 1) * ratio
+    assert physical.bottom() + 1 >= (rect.bottom() + 1) * ratio
+    # Never more than one extra pixel on each side
+    assert physical.width() <= rect.width() * ratio + 2
+    assert view.logicalRect(physical).contains(rect)
+
+
+def test_physicalRect_rounds_odd_pixels_outward(view):
+    view.pixmap = QPixmap(30, 30)
+    view.pixmap.setDevicePixelRatio(1.5)
+    # 1.5 to 6.0 physical pixels
+    assert view.physicalRect(QRect(1, 1, 3, 3)) == QRect(1, 1, 5, 5)
+    # 4 to 9 physical pixels are 2.67 to 6.0 logical pixels
+    assert view.logicalRect(QRect(4, 4, 5, 5)) == QRect(2, 2, 4, 4)
+
+
+@pytest.mark.parametrize("frozen", [True, False], ids=["frozen", "live"])
+def test_captureRegion_reads_physical_pixels(view, ratio, frozen):
+    view.captureScreen(0)
+    view.freezeFrame = frozen
+    rect = QRect(20, 10, 41, 17)
+    image = view.captureRegion(rect)
+    physical = view.physicalRect(rect)
+    assert abs(image.width() - physical.width()) <= 1
+    assert abs(image.height() - physical.height()) <= 1
+    # The top-left pixel is the one under the top-left of the selection
+    color = QColor(image.pixel(0, 0))
+    assert (color.red(), color.green()) == (physical.x(), physical.y())
+
+
+def test_pageFinished_maps_regions_to_view(view, ratio):
+    view.captureScreen(0)
+    # Odd edges at 1.5 fall inside a logical pixel, which is kept
+    physical = [QRect(30, 45, 61, 33), QRect(3, 3, 7, 7), QRect(4, 4, 5, 5)]
+    view.pageFinished(view._session, (physical, ["a", "b", "c"]), 0.0)
+    bands = [widget.geometry() for widget in view._regionWidgets[:3]]
+    assert bands == [view.logicalRect(rect) for rect in physical]
+    for band, rect in zip(bands, physical):
+        assert band.x() * ratio <= rect.x()
+        assert (band.right() + 1) * ratio >= rect.right() + 1
+
+
+def test_pageFinished_keeps_pending_regions(view, ratio):
+    view.captureScreen(0)
+    pending = QRect(200, 200, 40, 20)
+    view.addRegion(pending)
+    view.pageFinished(view._session, ([QRect(30, 45, 61, 33)], ["a"]), 0.0)
+    assert view._regions == [pending]
+    labels = [
+        widget for widget in view._regionWidgets if widget.inherits("QLabel")
+    ]
+    assert [label.text() for label in labels] == ["a"]
+
+
+def test_regions_of_an_earlier_session_are_dropped(view, ratio):
+    view.captureScreen(0)
+    session = view._session
+    view.resetSession()
+    view.captureScreen(0)
+    view.regionsFinished(session, [QRect(5, 5, 40, 20)], ["b"])
+    assert view._regionWidgets == []
+    view.regionsFinished(view._session, [QRect(5, 5, 40, 20)], ["c"])
+    assert [widget.text() for widget in view._regionWidgets] == ["c"]
+
+
+def test_page_of_an_earlier_session_is_dropped(view, ratio):
+    view.captureScreen(0)
+    session = view._session
+    view.resetSession()
+    view.captureScreen(0)
+    view.pageFinished(session, ([QRect(30, 45, 61, 33)], ["a"]), 0.0)
+    assert view._regionWidgets == []
+
+
+def test_resetSession_logs_only_its_own_crops(view, caplog):
+    metrics = view._sessionMetrics
+    metrics.increment("crops", 5)
+    metrics.increment("unchangedCrops", 3)
+    with caplog.at_level(logging.INFO, logger="cloe"):
+        view.resetSession()
+        # Late crops of the closed session do not count towards the next
+        metrics.increment("crops")
+        view.resetSession()
+    assert "snip reused 3 of 5 crops as unchanged" in caplog.text
+    assert caplog.text.count("snip reused") == 1
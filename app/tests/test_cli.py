@@ -0,0 +1,66 @@
+"""
+Cloe Command Line Tests
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+
+import pytest
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+import cli
+from utils.constants import MODEL_INPUT_LIMIT
+from utils.scripts import pixmapToText
+
+
+def fingerprint(image) -> str:
+    """
+    Stands in for the model, so that equal texts mean equal model inputs
+    """
+    digest = hashlib.sha1(image.tobytes()).hexdigest()
+    return f"{image.mode} {image.size} {digest}"
+
+
+@pytest.fixture
+def page(qapp, tmp_path) -> str:
+    # Larger than the model input limit and with blank margins, so that
+    # both the trim and the downscale apply
+    image = QImage(MODEL_INPUT_LIMIT * 3, 200, QImage.Format_RGB32)
+    image.fill(QColor("white"))
+    painter = QPainter(image)
+    painter.fillRect(QRect(40, 30, MODEL_INPUT_LIMIT * 2, 60), QColor("red"))
+    painter.fillRect(QRect(80, 120, 300, 40), QColor("black"))
+    painter.end()
+    path = str(tmp_path / "page.png")
+    assert image.save(path)
+    return path
+
+
+def test_cli_reads_like_the_snipping_window(page, monkeypatch):
+    monkeypatch.setattr(cli, "_model", fingerprint)
+    result = cli.readImage(page)
+    assert "error" not in result
+    assert result["text"] == pixmapToText(QImage(page), fingerprint)
+
+
+def test_cli_reports_unreadable_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_model", fingerprint)
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not an image")
+    assert "error" in cli.readImage(str(path))
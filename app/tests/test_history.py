@@ -0,0 +1,134 @@
+"""
+Cloe History Tests
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import pytest
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+from utils.cache import OCRCache
+from utils.change import ChangeDetector
+from utils.history import OCRHistory
+from utils.metrics import Metrics
+from utils.scripts import pixmapsToText, pixmapToText
+
+
+class FakeModel:
+    """
+    Returns the engine name and counts its calls
+    """
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.calls = 0
+
+    def __call__(self, image) -> str:
+        self.calls += 1
+        return self.engine
+
+    def batch(self, images) -> list[str]:
+        return [self(image) for image in images]
+
+
+@pytest.fixture
+def crop(qapp) -> QImage:
+    image = QImage(120, 60, QImage.Format_RGB32)
+    image.fill(QColor("white"))
+    painter = QPainter(image)
+    painter.fillRect(QRect(30, 20, 60, 20), QColor("black"))
+    painter.end()
+    return image
+
+
+@pytest.fixture
+def history(tmp_path) -> OCRHistory:
+    history = OCRHistory(str(tmp_path / "history.sqlite3"))
+    yield history
+    history.close()
+
+
+def latencies(history: OCRHistory) -> list[float]:
+    """
+    Commits the queued entries and returns their latencies, oldest first
+    """
+    history.close()
+    reopened = OCRHistory(history.path)
+    entries = reopened.search("")
+    reopened.close()
+    return [entry.latency for entry in reversed(entries)]
+
+
+def test_reused_texts_are_recorded_once(crop, history):
+    model = FakeModel("fp32")
+    cache = OCRCache(1024 * 1024)
+    detector = ChangeDetector()
+    read = lambda: pixmapToText(crop, model, cache, detector, history)
+
+    assert read() == "fp32"  # inference
+    assert read() == "fp32"  # detector
+    detector = ChangeDetector()
+    assert read() == "fp32"  # cache
+    cache = OCRCache(1024 * 1024)
+    detector = ChangeDetector()
+    assert read() == "fp32"  # history
+    assert model.calls == 1
+    recorded = latencies(history)
+    assert len(recorded) == 1
+    assert recorded[0] > 0
+
+
+def test_each_distinct_crop_is_recorded(crop, history):
+    model = FakeModel("fp32")
+    cache = OCRCache(1024 * 1024)
+    other = crop.copy()
+    painter = QPainter(other)
+    painter.fillRect(QRect(10, 10, 20, 40), QColor("black"))
+    painter.end()
+    for image in (crop, other, crop, other):
+        assert pixmapToText(image, model, cache, history=history) == "fp32"
+    assert model.calls == 2
+    assert len(latencies(history)) == 2
+
+
+def test_cached_text_without_entry_is_recorded(crop, history):
+    model = FakeModel("fp32")
+    cache = OCRCache(1024 * 1024)
+    assert pixmapsToText([crop], model, cache) == ["fp32"]
+    assert pixmapsToText([crop], model, cache, history) == ["fp32"]
+    assert pixmapsToText([crop], model, cache, history) == ["fp32"]
+    assert model.calls == 1
+    assert latencies(history) == [0]
+
+
+def test_engines_do_not_share_texts(crop, history):
+    cache = OCRCache(1024 * 1024, perceptual=True)
+    fp32, int8 = FakeModel("fp32"), FakeModel("int8")
+    assert pixmapToText(crop, fp32, cache, history=history) == "fp32"
+    assert pixmapToText(crop, int8, cache, history=history) == "int8"
+    assert pixmapToText(crop, fp32, cache, history=history) == "fp32"
+    assert (fp32.calls, int8.calls) == (1, 1)
+
+
+def test_session_metrics_count_crops(crop):
+    model = FakeModel("fp32")
+    detector, session = ChangeDetector(), Metrics()
+    for _ in range(3):
+        pixmapToText(crop, model, detector=detector, sessionMetrics=session)
+    assert session.count("crops") == 3
+    assert session.count("unchangedCrops") == 2
@@ -0,0 +1,80 @@
+"""
+Cloe Scheduler Tests
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import threading
+
+import pytest
+from PyQt5.QtCore import QThreadPool
+
+from components.services import OCRScheduler
+
+TIMEOUT = 5000
+
+
+@pytest.fixture(autouse=True)
+def drainPool(qapp):
+    """
+    Waits for the workers to finish emitting before the test ends
+    """
+    yield
+    QThreadPool.globalInstance().waitForDone(TIMEOUT)
+
+
+def test_failed_request_is_logged(qapp, caplog):
+    def fail():
+        raise RuntimeError("model crashed")
+
+    scheduler = OCRScheduler(fail)
+    with caplog.at_level(logging.ERROR, logger="cloe"):
+        generation = scheduler.request()
+        assert scheduler.waitForResult(generation, TIMEOUT) == ""
+    assert "model crashed" in caplog.text
+
+
+def test_reset_drops_earlier_results(qapp):
+    started, release = threading.Event(), threading.Event()
+
+    def read(text: str) -> str:
+        started.set()
+        release.wait(TIMEOUT / 1000)
+        return text
+
+    scheduler = OCRScheduler(read)
+    release.set()
+    first = scheduler.request("first")
+    assert scheduler.waitForResult(first, TIMEOUT) == "first"
+
+    emitted = []
+    scheduler.result.connect(lambda generation, text: emitted.append(text))
+    started.clear()
+    release.clear()
+    stale = scheduler.request("stale")
+    started.wait(TIMEOUT / 1000)
+    scheduler.reset()
+    release.set()
+
+    # Neither the completed result nor the one in flight carry over
+    assert scheduler.waitForResult(first, 100) is None
+    assert scheduler.waitForResult(stale, 500) is None
+    assert emitted == []
+
+    fresh = scheduler.request("fresh")
+    assert scheduler.waitForResult(fresh, TIMEOUT) == "fresh"
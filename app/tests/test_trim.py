@@ -0,0 +1,94 @@
+"""
+Cloe Trim Tests
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import pytest
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+from utils.change import ChangeDetector, inkBox
+from utils.scripts import imageToArray, trimImage
+
+# (ink, background) pairs, including ones that share a channel
+COLORS = {
+    "black-on-white": ("#000000", "#ffffff"),
+    "white-on-black": ("#ffffff", "#000000"),
+    "red-on-black": ("#ff0000", "#000000"),
+    "yellow-on-green": ("#ffff00", "#00ff00"),
+    "magenta-on-blue": ("#ff00ff", "#0000ff"),
+    "cyan-on-white": ("#00ffff", "#ffffff"),
+}
+INK = QRect(40, 30, 50, 20)
+
+
+def makeCrop(ink: str, background: str) -> QImage:
+    """
+    Returns a 160x80 crop with a block of ink at INK
+    """
+    image = QImage(160, 80, QImage.Format_RGB32)
+    image.fill(QColor(background))
+    painter = QPainter(image)
+    painter.fillRect(INK, QColor(ink))
+    painter.end()
+    return image
+
+
+@pytest.mark.parametrize("colors", COLORS.values(), ids=COLORS.keys())
+def test_inkBox_finds_colored_ink(colors):
+    image = makeCrop(*colors)
+    assert inkBox(imageToArray(image)) == (
+        INK.x(),
+        INK.y(),
+        INK.width(),
+        INK.height(),
+    )
+
+
+@pytest.mark.parametrize("colors", COLORS.values(), ids=COLORS.keys())
+def test_trimImage_keeps_margin(colors):
+    trimmed = trimImage(makeCrop(*colors), margin=8)
+    assert trimmed is not None
+    assert (trimmed.width(), trimmed.height()) == (
+        INK.width() + 16,
+        INK.height() + 16,
+    )
+
+
+def test_trimImage_blank_crop():
+    image = QImage(64, 64, QImage.Format_RGB32)
+    image.fill(QColor("#00ff00"))
+    assert trimImage(image) is None
+
+
+def test_inkBox_grayscale():
+    image = makeCrop("#000000", "#ffffff").convertToFormat(
+        QImage.Format_Grayscale8
+    )
+    assert inkBox(imageToArray(image)) == (40, 30, 50, 20)
+
+
+def test_changeDetector_sees_color_change():
+    detector = ChangeDetector()
+    red = makeCrop("#ff0000", "#000000")
+    blue = makeCrop("#0000ff", "#000000")
+    text, signature = detector.lookup(imageToArray(red))
+    assert text is None
+    detector.remember(signature, "text")
+    assert detector.lookup(imageToArray(red))[0] == "text"
+    assert detector.lookup(imageToArray(blue))[0] is None
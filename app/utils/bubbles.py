@@ -0,0 +1,206 @@
+"""
+Cloe Text Region Detector
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from functools import reduce
+
+import numpy as np
+
+from utils.change import colorChannels
+
+# The frame is reduced to blocks of this many pixels per side
+_BLOCK = 4
+# A block with a pixel darker than this has ink, one whose pixels are all
+# lighter than _PAPER is blank paper
+_INK = 110
+_PAPER = 200
+# Gap in blocks bridged between glyphs of the same bubble
+_GAP = 3
+# Blocks around a region that must be paper for it to be a bubble
+_RING = 3
+_RING_PAPER = 0.6
+# Share of a region's blocks that must be ink
+_DENSITY = (0.15, 0.95)
+# Smallest region side in blocks, and largest share of the frame
+_MIN_SIDE = 3
+_MAX_AREA = 0.1
+# Pixels of padding added around a region
+_PADDING = 4
+
+
+def findTextRegions(array: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """Finds blocks of text surrounded by blank paper, such as speech bubbles
+
+    Args:
+        array (np.ndarray): Pixels of the frame, as returned by imageToArray.
+
+    Each pixel counts as its darkest color channel, so that it is ink if
+    any channel is dark and paper only if every channel is light, like the
+    ink of inkBox. Colored text is found even when one channel has no
+    contrast with the paper.
+
+    The frame is reduced to small blocks. Blocks with both ink and paper
+    are the edges of glyphs or artwork. Nearby edge blocks are joined with
+    a morphological closing and labelled as connected components. A
+    component is kept if it is small, dense and mostly ringed by paper,
+    which tells text in a bubble from lines of the artwork.
+
+    Returns the regions as (x, y, width, height) in pixels, ordered from
+    top to bottom and right to left.
+    """
+    channel = reduce(np.minimum, colorChannels(array))
+    h, w = channel.shape[0] // _BLOCK, channel.shape[1] // _BLOCK
+    if h == 0 or w == 0:
+        return []
+    darkest = _reduceBlocks(channel, h, w, np.minimum)
+    paper = darkest > _PAPER
+    edges = (darkest < _INK) & (
+        _reduceBlocks(channel, h, w, np.maximum) > _PAPER
+    )
+
+    closed = _erode(_dilate(edges, _GAP), _GAP)
+    cells, components = _label(closed)
+    if cells.size == 0:
+        return []
+
+    ys, xs = np.divmod(cells, w)
+    count = components.max() + 1
+    left = np.full(count, w)
+    top = np.full(count, h)
+    right = np.zeros(count, int)
+    bottom = np.zeros(count, int)
+    np.minimum.at(left, components, xs)
+    np.minimum.at(top, components, ys)
+    np.maximum.at(right, components, xs + 1)
+    np.maximum.at(bottom, components, ys + 1)
+    ink = np.bincount(components, edges.ravel()[cells], count)
+
+    width, height = right - left, bottom - top
+    area = width * height
+    density = ink / area
+
+    # Paper blocks in the ring around each box, from a summed-area table
+    table = np.zeros((h + 1, w + 1), np.int32)
+    table[1:, 1:] = paper.cumsum(0).cumsum(1)
+    outerLeft = np.maximum(left - _RING, 0)
+    outerTop = np.maximum(top - _RING, 0)
+    outerRight = np.minimum(right + _RING, w)
+    outerBottom = np.minimum(bottom + _RING, h)
+    outerArea = (outerRight - outerLeft) * (outerBottom - outerTop)
+    ringPaper = _boxSums(table, outerLeft, outerTop, outerRight, outerBottom)
+    ringPaper -= _boxSums(table, left, top, right, bottom)
+    ringArea = np.maximum(outerArea - area, 1)
+
+    keep = (
+        (np.minimum(width, height) >= _MIN_SIDE)
+        & (area <= _MAX_AREA * w * h)
+        & (density >= _DENSITY[0])
+        & (density <= _DENSITY[1])
+        & (ringPaper / ringArea >= _RING_PAPER)
+    )
+
+    regions = []
+    for i in np.flatnonzero(keep):
+        x = max(0, left[i] * _BLOCK - _PADDING)
+        y = max(0, top[i] * _BLOCK - _PADDING)
+        x2 = min(channel.shape[1], right[i] * _BLOCK + _PADDING)
+        y2 = min(channel.shape[0], bottom[i] * _BLOCK + _PADDING)
+        regions.append((int(x), int(y), int(x2 - x), int(y2 - y)))
+
+    # Manga is read in rows from the top, right to left within a row
+    band = max(1, channel.shape[0] // 6)
+    regions.sort(key=lambda r: (r[1] // band, -(r[0] + r[2])))
+    return regions
+
+
+# ---------------------------------- Morphology --------------------------------- #
+
+
+def _reduceBlocks(channel: np.ndarray, h: int, w: int, op: np.ufunc):
+    # Combining strided slices is several times faster than reducing
+    # a (h, block, w, block) view over two axes
+    channel = channel[: h * _BLOCK, : w * _BLOCK]
+    rows = reduce(op, (channel[i::_BLOCK] for i in range(_BLOCK)))
+    return reduce(op, (rows[:, i::_BLOCK] for i in range(_BLOCK)))
+
+
+def _dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    out = mask.copy()
+    for d in range(1, radius + 1):
+        out[:, d:] |= mask[:, :-d]
+        out[:, :-d] |= mask[:, d:]
+    rows = out.copy()
+    for d in range(1, radius + 1):
+        out[d:] |= rows[:-d]
+        out[:-d] |= rows[d:]
+    return out
+
+
+def _erode(mask: np.ndarray, radius: int) -> np.ndarray:
+    return ~_dilate(~mask, radius)
+
+
+def _label(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Labels the 4-connected components of a mask
+
+    Neighbouring cells hook the larger of their roots onto the smaller one,
+    then every cell jumps to its root, until no neighbours differ. Each
+    round is a few array operations, and the rounds grow roughly with the
+    logarithm of the component size.
+
+    Returns the flat indices of the set cells and their component numbers.
+    """
+    cells = np.flatnonzero(mask)
+    position = np.full(mask.size, -1, np.int64)
+    position[cells] = np.arange(cells.size)
+
+    grid = position.reshape(mask.shape)
+    horizontal = mask[:, :-1] & mask[:, 1:]
+    vertical = mask[:-1] & mask[1:]
+    u = np.concatenate([grid[:, :-1][horizontal], grid[:-1][vertical]])
+    v = np.concatenate([grid[:, 1:][horizontal], grid[1:][vertical]])
+
+    parent = np.arange(cells.size)
+    while True:
+        pu, pv = parent[u], parent[v]
+        differ = pu != pv
+        if not differ.any():
+            break
+        np.minimum.at(
+            parent,
+            np.maximum(pu, pv)[differ],
+            np.minimum(pu, pv)[differ],
+        )
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    _, components = np.unique(parent, return_inverse=True)
+    return cells, components
+
+
+def _boxSums(table: np.ndarray, left, top, right, bottom) -> np.ndarray:
+    return (
+        table[bottom, right]
+        - table[top, right]
+        - table[bottom, left]
+        + table[top, left]
+    )
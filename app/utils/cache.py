@@ -0,0 +1,218 @@
+"""
+Cloe OCR Result Cache
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Approximate bookkeeping cost of one in-memory entry
+_ENTRY_OVERHEAD = 128
+
+
+class OCRCache:
+    """Two-tier cache of OCR results keyed by the engine and the pixels of the crop
+
+    Args:
+        memoryBudget (int): Size limit of the in-memory LRU in bytes.
+        path (str, optional): SQLite file for the disk tier. The disk tier is
+        disabled if None. Defaults to None.
+        diskLimit (int, optional): Maximum entries kept on disk. Defaults to 100000.
+        perceptual (bool, optional): Also match crops by a perceptual hash,
+        which tolerates a pixel or two of jitter. Defaults to False.
+
+    *Note: The cache is shared between the GUI and worker threads.
+    """
+
+    def __init__(
+        self,
+        memoryBudget: int,
+        path: Optional[str] = None,
+        diskLimit: int = 100000,
+        perceptual: bool = False,
+    ):
+        self.memoryBudget = memoryBudget
+        self.diskLimit = diskLimit
+        self.perceptual = perceptual
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memorySize = 0
+
+        self._disk = None
+        self._diskWrites = 0
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, text TEXT, created REAL)"
+            )
+            self._disk.commit()
+
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+    # ------------------------------------- Keys ------------------------------------ #
+
+    def keys(
+        self, array: np.ndarray, engine: str = ""
+    ) -> tuple[str, Optional[str]]:
+        """Computes the lookup keys of a crop
+
+        Args:
+            array (np.ndarray): Pixels of the crop, as returned by imageToArray.
+            engine (str, optional): Engine of the model, so that texts read by
+            one engine are not served for another. Defaults to "".
+
+        Returns the content hash and, if enabled, the perceptual hash.
+        """
+        perceptualKey = None
+        if self.perceptual:
+            perceptualKey = self._perceptualKey(array)
+            if perceptualKey is not None:
+                perceptualKey = f"{engine}:{perceptualKey}"
+        return self.contentKey(array, engine), perceptualKey
+
+    @staticmethod
+    def contentKey(array: np.ndarray, engine: str = "") -> str:
+        """
+        Returns the hash of the pixels and shape of a crop, prefixed by the engine
+        """
+        digest = hashlib.sha1(np.ascontiguousarray(array))
+        digest.update(str(array.shape).encode())
+        return f"{engine}:c:{digest.hexdigest()}"
+
+    def _perceptualKey(self, array: np.ndarray) -> Optional[str]:
+        # Difference hash over an 8x9 grid of block means. The aspect
+        # ratio is part of the key so that differently shaped crops with
+        # similar gradients do not collide.
+        h, w = array.shape[:2]
+        if h < 8 or w < 9:
+            return None
+        channel = array[..., 1] if array.ndim == 3 else array
+        rows = np.linspace(0, h, 9, dtype=int)
+        cols = np.linspace(0, w, 10, dtype=int)
+        sums = np.add.reduceat(
+            np.add.reduceat(channel, rows[:-1], axis=0, dtype=np.uint64),
+            cols[:-1],
+            axis=1,
+        )
+        means = sums / np.outer(np.diff(rows), np.diff(cols))
+        bits = np.packbits(means[:, 1:] > means[:, :-1])
+        return f"p:{bits.tobytes().hex()}:{round(w / h * 4)}"
+
+    # ----------------------------------- Lookups ----------------------------------- #
+
+    def get(self, keys: tuple[str, Optional[str]]) -> Optional[str]:
+        """
+        Returns the cached text for the keys, or None on a miss
+        """
+        with self._lock:
+            for key in keys:
+                if key is not None and key in self._memory:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return self._memory[key]
+
+            if self._disk is not None:
+                for key in keys:
+                    if key is None:
+                        continue
+                    row = self._disk.execute(
+                        "SELECT text FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        self._remember(key, row[0])
+                        self.diskHits += 1
+                        return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, keys: tuple[str, Optional[str]], text: str):
+        """
+        Stores the text under every key
+        """
+        with self._lock:
+            for key in keys:
+                if key is not None:
+                    self._remember(key, text)
+
+            if self._disk is not None:
+                now = time.time()
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                    [(key, text, now) for key in keys if key is not None],
+                )
+                self._diskWrites += 1
+                if self._diskWrites % 1000 == 0:
+                    self._pruneDisk()
+                self._disk.commit()
+
+    def _remember(self, key: str, text: str):
+        if key in self._memory:
+            self._memorySize -= self._entrySize(key, self._memory.pop(key))
+        self._memory[key] = text
+        self._memorySize += self._entrySize(key, text)
+
+        while self._memorySize > self.memoryBudget and self._memory:
+            oldKey, oldText = self._memory.popitem(last=False)
+            self._memorySize -= self._entrySize(oldKey, oldText)
+
+    def _entrySize(self, key: str, text: str) -> int:
+        return len(key) + len(text.encode("utf-8")) + _ENTRY_OVERHEAD
+
+    def _pruneDisk(self):
+        self._disk.execute(
+            "DELETE FROM results WHERE key NOT IN "
+            "(SELECT key FROM results ORDER BY created DESC LIMIT ?)",
+            (self.diskLimit,),
+        )
+
+    # ------------------------------------ Stats ------------------------------------ #
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters and the memory tier usage
+        """
+        with self._lock:
+            lookups = self.hits + self.diskHits + self.misses
+            return {
+                "hits": self.hits,
+                "diskHits": self.diskHits,
+                "misses": self.misses,
+                "hitRate": (self.hits + self.diskHits) / lookups
+                if lookups
+                else 0.0,
+                "memoryEntries": len(self._memory),
+                "memoryBytes": self._memorySize,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._disk is not None:
+                self._disk.commit()
+                self._disk.close()
+                self._disk = None
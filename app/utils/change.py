@@ -0,0 +1,180 @@
+"""
+Cloe Crop Change Detector
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from typing import Optional
+
+import numpy as np
+
+# Pixels further than this from the background level count as ink
+_INK_CONTRAST = 48
+# Side of the grid the trimmed ink is averaged down to
+_GRID = 16
+# Largest difference (0-255) of any grid cell for the content to be the same.
+# A changed glyph moves its cells far more than resampling does, while a
+# mean over all cells would hide it.
+_GRID_TOLERANCE = 48
+# Allowed change of the ink box, in pixels and relative to its size
+_SIZE_TOLERANCE = 2
+_SIZE_RATIO_TOLERANCE = 0.03
+
+# Byte offsets of the color channels of a 32-bit RGB pixel, skipping alpha
+_COLOR_CHANNELS = (0, 1, 2) if sys.byteorder == "little" else (1, 2, 3)
+
+
+def colorChannels(array: np.ndarray) -> list[np.ndarray]:
+    """
+    Returns views of the color channels of an array from imageToArray
+    """
+    if array.ndim == 2:
+        return [array]
+    return [array[..., i] for i in _COLOR_CHANNELS]
+
+
+def inkBox(array: np.ndarray) -> Optional[tuple[int, int, int, int]]:
+    """Finds the bounding box of the ink in a crop
+
+    Args:
+        array (np.ndarray): Pixels of the crop, as returned by imageToArray.
+
+    Each color channel has its own background level, the median of a
+    sample of rows. A pixel that differs from it by more than the ink
+    contrast in any channel is ink, so colored text on a colored background
+    is found even when one channel is the same for both. The ink is
+    projected onto both axes, and the first and last marked row and column
+    bound it.
+
+    Returns (x, y, width, height), or None if the crop has no ink.
+    """
+    if array.size == 0:
+        return None
+    ink = None
+    for channel in colorChannels(array):
+        sample = channel[:: max(1, channel.shape[0] // 32)]
+        background = int(np.median(sample))
+        # Compared in uint8 against clamped bounds to avoid a widened copy
+        channelInk = channel < max(0, background - _INK_CONTRAST)
+        channelInk |= channel > min(255, background + _INK_CONTRAST)
+        if ink is None:
+            ink = channelInk
+        else:
+            ink |= channelInk
+    rows = np.flatnonzero(ink.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(ink.any(axis=0))
+    return (
+        int(cols[0]),
+        int(rows[0]),
+        int(cols[-1] - cols[0] + 1),
+        int(rows[-1] - rows[0] + 1),
+    )
+
+
+class ChangeDetector:
+    """Tells whether a crop shows the same text as the last crop read
+
+    The crop is trimmed to the bounding box of its ink and averaged down to
+    a small grid. Moving a selection edge across blank background does not
+    change either, so the previous text can be reused. Cutting into or
+    uncovering a glyph changes the box or the grid, and the crop is read.
+
+    *Note: Not thread-safe. Use one detector per view, from one thread at a time.
+    """
+
+    def __init__(self):
+        self._signature: Optional[
+            tuple[tuple[float, float], np.ndarray]
+        ] = None
+        self._text: Optional[str] = None
+
+    def signature(
+        self, array: np.ndarray, scale: tuple[float, float] = (1.0, 1.0)
+    ) -> Optional[tuple[tuple[float, float], np.ndarray]]:
+        """Computes the ink box size and grid of a crop
+
+        Args:
+            array (np.ndarray): Pixels of the crop, as returned by imageToArray.
+            scale (tuple[float, float], optional): Horizontal and vertical
+            factor the crop was downscaled by, so that box sizes of crops
+            downscaled by different factors compare. Defaults to (1.0, 1.0).
+
+        Returns None if the crop has no ink.
+        """
+        bounds = inkBox(array)
+        if bounds is None:
+            return None
+
+        x, y, w, h = bounds
+        rowEdges = np.linspace(0, h, min(_GRID, h) + 1, dtype=int)
+        colEdges = np.linspace(0, w, min(_GRID, w) + 1, dtype=int)
+        counts = np.outer(np.diff(rowEdges), np.diff(colEdges))
+        # One grid per color channel, so that a change of color moves it
+        # even when the brightness stays the same
+        grid = np.stack(
+            [
+                np.add.reduceat(
+                    np.add.reduceat(
+                        channel[y : y + h, x : x + w],
+                        rowEdges[:-1],
+                        axis=0,
+                        dtype=np.uint32,
+                    ),
+                    colEdges[:-1],
+                    axis=1,
+                )
+                / counts
+                for channel in colorChannels(array)
+            ]
+        )
+        return (w / scale[0], h / scale[1]), grid
+
+    def lookup(
+        self, array: np.ndarray, scale: tuple[float, float] = (1.0, 1.0)
+    ) -> tuple[Optional[str], object]:
+        """Returns the previous text if the crop is unchanged, else None
+
+        The second value is the signature of the crop, to pass to remember.
+        See signature for the arguments.
+        """
+        signature = self.signature(array, scale)
+        if self._matches(signature):
+            return self._text, signature
+        return None, signature
+
+    def remember(self, signature: object, text: str):
+        """
+        Stores the text read from the crop with the signature
+        """
+        self._signature = signature
+        self._text = text
+
+    def _matches(self, signature) -> bool:
+        if signature is None or self._signature is None:
+            return False
+        (w, h), grid = signature
+        (lastW, lastH), lastGrid = self._signature
+        for size, last in ((w, lastW), (h, lastH)):
+            tolerance = max(_SIZE_TOLERANCE, last * _SIZE_RATIO_TOLERANCE)
+            if abs(size - last) > tolerance:
+                return False
+        if grid.shape != lastGrid.shape:
+            return False
+        return np.abs(grid - lastGrid).max() < _GRID_TOLERANCE
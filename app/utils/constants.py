@@ -39,6 +39,10 @@ STYLESHEET_DEFAULT = "./assets/styles.qss"
 # Config
 HOTKEY_CONFIG = "./utils/cloe-hotkey.ini"
 VIEW_CONFIG = "./utils/cloe-view.ini"
+PERFORMANCE_CONFIG = "./utils/cloe-performance.ini"
+
+# Time (ms) after the last change before settings are written to disk
+SETTINGS_WRITE_DELAY = 500
 
 # Defaults
 HOTKEY_DEFAULT = {
@@ -49,6 +53,13 @@ HOTKEY_DEFAULT = {
         # "winKey": "false",
         "mainKey": 17,
     },
+    "readPage": {
+        "shiftKey": "false",
+        "ctrlKey": "false",
+        "altKey": "true",
+        # "winKey": "false",
+        "mainKey": 23,
+    },
     "unmapped": {
         "shiftKey": "false",
         "ctrlKey": "false",
@@ -68,8 +79,28 @@ VIEW_DEFAULT = {
     "selectionBorderThickness": 2,
     "selectionBackground": QColor(0, 128, 255, 60),
     "windowColor": QColor(255, 255, 255, 13),
+    # Capture
+    "freezeFrame": True,
+    "saveLog": False,
 }
 
+PERFORMANCE_DEFAULT = {
+    # Run the model in a separate process instead of a GUI process thread
+    "inferenceProcess": False,
+    # Model: "fp32", dynamically quantized "int8", or "onnx" (ONNX Runtime)
+    "engine": "fp32",
+    # Inference threads, 0 for automatic
+    "intraOpThreads": 0,
+    "interOpThreads": 0,
+    # Cores kept free for the UI, hotkey listener and worker threads
+    "reservedCores": 1,
+    "cpuAffinity": False,
+    "lowPriority": False,
+    # Polling interval of a watched region in milliseconds
+    "watchInterval": 250,
+}
+ENGINES = ["fp32", "int8", "onnx"]
+
 # Constants
 UNMAPPED_KEY = "<Unmapped>"
 VALID_KEY_LIST = [
@@ -102,6 +133,65 @@ VALID_KEY_LIST = [
     "Z",
 ]
 
+# --------------------------------------- OCR --------------------------------------- #
+
+# Time (ms) the selection must be still before the crop is read
+OCR_DEBOUNCE_INTERVAL = 300
+# Time (ms) to wait for the result of the final selection on release
+OCR_FINAL_RESULT_TIMEOUT = 2000
+
+# Crops are downscaled so that neither axis exceeds twice the 224px input
+MODEL_INPUT_SIZE = 224
+MODEL_INPUT_LIMIT = 2 * MODEL_INPUT_SIZE
+
+# Pixels of background kept around the ink when a crop is trimmed
+CROP_MARGIN = 8
+
+# Model warm-up: crop sizes (width, height) and passes over them
+MODEL_WARMUP_SIZES = [(200, 200), (160, 480), (480, 160), (600, 600)]
+MODEL_WARMUP_ROUNDS = 1
+
+# Latency measurement of the performance settings tab
+LATENCY_MEASURE_SIZES = [(200, 200), (160, 480)]
+LATENCY_MEASURE_ROUNDS = 3
+
+# Dynamically quantized model, saved after the first int8 launch
+QUANTIZED_MODEL_FILE = "./utils/cloe-model-int8.pt"
+
+# Graphs exported for the ONNX Runtime engine
+ONNX_MODEL_DIR = "./utils/cloe-onnx"
+
+# Out-of-process inference: shared memory slots and grayscale pixels per slot
+INFERENCE_SLOTS = 4
+INFERENCE_SLOT_SIZE = 3840 * 2160
+
+# Result cache
+CACHE_FILE = "./utils/cloe-cache.sqlite3"
+CACHE_MEMORY_BUDGET = 4 * 1024 * 1024  # bytes
+CACHE_PERCEPTUAL = False
+
+# History of read texts and the rows shown per search
+HISTORY_FILE = "./utils/cloe-history.sqlite3"
+HISTORY_SEARCH_LIMIT = 200
+
+# Watched region: longest polling interval when idle (ms), polls without
+# change before reading, grid side and largest grid difference (0-255)
+# that counts as unchanged
+WATCH_MAX_INTERVAL = 2000
+WATCH_SETTLE_FRAMES = 2
+WATCH_GRID = 32
+WATCH_TOLERANCE = 8
+
+# Number of spans kept for the trace export
+TRACE_BUFFER_SIZE = 20000
+
+# Text log: JSON lines written in batches and rotated by size
+LOG_FILE = "./utils/cloe-log.jsonl"
+LOG_MAX_BYTES = 1024 * 1024  # bytes
+LOG_BACKUPS = 3
+LOG_FLUSH_SIZE = 32  # entries
+LOG_FLUSH_INTERVAL = 2.0  # seconds
+
 # --------------------------------------- Misc -------------------------------------- #
 
 # Popups
@@ -0,0 +1,317 @@
+"""
+Cloe ONNX Engine
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import os
+import re
+
+import numpy as np
+from PIL import Image
+
+# Files written by exportOnnx
+_ENCODER = "encoder.onnx"
+_DECODER_INIT = "decoder_init.onnx"
+_DECODER_WITH_PAST = "decoder_with_past.onnx"
+_CONFIG = "config.json"
+
+
+def postProcess(text: str) -> str:
+    """
+    Copy of manga_ocr.ocr.post_process, which cannot be imported without torch
+    """
+    import jaconv
+
+    text = "".join(text.split())
+    text = text.replace("…", "...")
+    text = re.sub("[・.]{2,}", lambda x: (x.end() - x.start()) * ".", text)
+    return jaconv.h2z(text, ascii=True, digit=True)
+
+
+def exportOnnx(directory: str, name: str = "kha-white/manga-ocr-base"):
+    """Exports the MangaOcr encoder and decoder to ONNX
+
+    Args:
+        directory (str): Directory to write the graphs and config to.
+        name (str, optional): Pretrained model. Defaults to the MangaOcr model.
+
+    The decoder is exported twice: decoder_init reads the start token, and
+    decoder_with_past reads one token plus the key/value cache of the
+    previous steps, so every step after the first is a single-token pass.
+    The vocabulary and preprocessing settings are saved with the graphs, so
+    OnnxModel needs neither torch nor transformers.
+
+    *Note: Needs torch, transformers and a few minutes. Run it once.
+    """
+    import torch
+    from transformers import (
+        AutoFeatureExtractor,
+        AutoTokenizer,
+        VisionEncoderDecoderModel,
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    extractor = AutoFeatureExtractor.from_pretrained(name)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = VisionEncoderDecoderModel.from_pretrained(name).eval()
+
+    class DecoderInit(torch.nn.Module):
+        def __init__(self, decoder):
+            super().__init__()
+            self.decoder = decoder
+
+        def forward(self, input_ids, encoder_hidden_states):
+            out = self.decoder(
+                input_ids=input_ids,
+                encoder_hidden_states=encoder_hidden_states,
+                use_cache=True,
+                return_dict=True,
+            )
+            return (out.logits, *sum(out.past_key_values, ()))
+
+    class DecoderWithPast(DecoderInit):
+        def forward(self, input_ids, encoder_hidden_states, *past):
+            out = self.decoder(
+                input_ids=input_ids,
+                encoder_hidden_states=encoder_hidden_states,
+                past_key_values=tuple(
+                    past[i : i + perLayer]
+                    for i in range(0, len(past), perLayer)
+                ),
+                use_cache=True,
+                return_dict=True,
+            )
+            return (out.logits, *sum(out.past_key_values, ()))
+
+    size = extractor.size
+    if isinstance(size, dict):
+        size = size["height"]
+    pixels = torch.zeros(1, 3, size, size)
+    start = model.config.decoder_start_token_id
+    ids = torch.tensor([[start]])
+
+    with torch.no_grad():
+        hidden = model.encoder(pixel_values=pixels).last_hidden_state
+        past = DecoderInit(model.decoder)(ids, hidden)[1:]
+        layers = model.decoder.config.num_hidden_layers
+        perLayer = len(past) // layers
+
+        torch.onnx.export(
+            model.encoder,
+            (pixels,),
+            os.path.join(directory, _ENCODER),
+            input_names=["pixel_values"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={"pixel_values": {0: "batch"}},
+            opset_version=14,
+        )
+
+        # Self-attention entries grow by one token per step, cross-attention
+        # entries keep the length of the encoder output
+        pastNames = [f"past_{i}" for i in range(len(past))]
+        presentNames = [f"present_{i}" for i in range(len(past))]
+        pastAxes = {
+            name: {0: "batch", 2: "past"} if i % perLayer < 2 else {0: "batch"}
+            for i, name in enumerate(pastNames)
+        }
+        presentAxes = {
+            name: {0: "batch", 2: "past"} if i % perLayer < 2 else {0: "batch"}
+            for i, name in enumerate(presentNames)
+        }
+        common = {
+            "input_ids": {0: "batch", 1: "sequence"},
+            "encoder_hidden_states": {0: "batch"},
+            "logits": {0: "batch", 1: "sequence"},
+        }
+        torch.onnx.export(
+            DecoderInit(model.decoder),
+            (ids, hidden),
+            os.path.join(directory, _DECODER_INIT),
+            input_names=["input_ids", "encoder_hidden_states"],
+            output_names=["logits", *presentNames],
+            dynamic_axes={**common, **presentAxes},
+            opset_version=14,
+        )
+        torch.onnx.export(
+            DecoderWithPast(model.decoder),
+            (ids, hidden, *past),
+            os.path.join(directory, _DECODER_WITH_PAST),
+            input_names=["input_ids", "encoder_hidden_states", *pastNames],
+            output_names=["logits", *presentNames],
+            dynamic_axes={**common, **pastAxes, **presentAxes},
+            opset_version=14,
+        )
+
+    config = {
+        "size": size,
+        "mean": list(extractor.image_mean),
+        "std": list(extractor.image_std),
+        "startToken": start,
+        "endToken": model.config.eos_token_id
+        or model.decoder.config.sep_token_id,
+        "maxLength": 300,
+        "vocab": tokenizer.convert_ids_to_tokens(list(range(len(tokenizer)))),
+        "specialTokens": tokenizer.all_special_ids,
+    }
+    with open(os.path.join(directory, _CONFIG), "w", encoding="utf-8") as fh:
+        json.dump(config, fh, ensure_ascii=False)
+
+
+class OnnxModel:
+    """Reads text with the ONNX graphs written by exportOnnx
+
+    Args:
+        directory (str): Directory of the exported graphs.
+        threads (int, optional): Intra-op threads. Defaults to onnxruntime's
+        choice.
+
+    Callable like MangaOcr: takes a PIL image and returns the text, decoded
+    greedily with the key/value cache. batch reads several crops with one
+    encoder pass and one decoder pass per token. Only numpy and onnxruntime
+    are used.
+
+    *Note: Graphs exported before batching was supported have a fixed batch
+    of one. batch reads their crops one by one; export again to batch them.
+    """
+
+    def __init__(self, directory: str, threads: int = 0):
+        self.directory = directory
+        self.threads = threads
+        self._createSessions()
+
+        with open(os.path.join(directory, _CONFIG), encoding="utf-8") as fh:
+            config = json.load(fh)
+        self.size = config["size"]
+        self.mean = np.array(config["mean"], np.float32)[:, None, None]
+        self.std = np.array(config["std"], np.float32)[:, None, None]
+        self.startToken = config["startToken"]
+        self.endToken = config["endToken"]
+        self.maxLength = config["maxLength"]
+        self.vocab = config["vocab"]
+        self.specialTokens = set(config["specialTokens"])
+
+    def setThreads(self, threads: int):
+        """
+        Changes the intra-op threads, the sessions are rebuilt on the next read
+        """
+        self.threads = threads
+
+    def _createSessions(self):
+        # The thread count of a session is fixed when it is created
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        options.intra_op_num_threads = self.threads
+
+        def session(name: str):
+            return onnxruntime.InferenceSession(
+                os.path.join(self.directory, name),
+                options,
+                providers=["CPUExecutionProvider"],
+            )
+
+        self.encoder = session(_ENCODER)
+        self.decoderInit = session(_DECODER_INIT)
+        self.decoderWithPast = session(_DECODER_WITH_PAST)
+        self._sessionThreads = self.threads
+        # Unused inputs may be pruned from a graph by the exporter
+        self._pastInputs = {i.name for i in self.decoderWithPast.get_inputs()}
+        # A fixed first axis means the graph was exported for single crops
+        self.batchable = all(
+            not isinstance(i.shape[0], int)
+            for graph in (self.encoder, self.decoderInit, self.decoderWithPast)
+            for i in graph.get_inputs()
+        )
+
+    def preprocess(self, image: Image.Image) -> np.ndarray:
+        """
+        Same steps as the MangaOcr feature extractor, in numpy
+        """
+        image = image.convert("L").convert("RGB")
+        image = image.resize((self.size, self.size), Image.BILINEAR)
+        pixels = np.asarray(image, np.float32).transpose(2, 0, 1) / 255
+        return (pixels - self.mean) / self.std
+
+    def decode(self, ids: list[int]) -> str:
+        tokens = [self.vocab[i] for i in ids if i not in self.specialTokens]
+        return postProcess(" ".join(tokens).replace(" ##", ""))
+
+    def __call__(self, image: Image.Image) -> str:
+        return self.recognize([image])[0]
+
+    def batch(self, images: list[Image.Image]) -> list[str]:
+        """
+        Reads the crops as one batch, or one by one with a single-crop export
+        """
+        if not images:
+            return []
+        if not self.batchable:
+            return [self(image) for image in images]
+        return self.recognize(images)
+
+    def recognize(self, images: list[Image.Image]) -> list[str]:
+        """Decodes the crops greedily in lockstep
+
+        Every step feeds one token per crop. Crops that reached the end
+        token keep being fed it until the whole batch is done, and the
+        tokens generated after it are dropped.
+        """
+        if self._sessionThreads != self.threads:
+            self._createSessions()
+        pixels = np.stack([self.preprocess(image) for image in images])
+        (hidden,) = self.encoder.run(None, {"pixel_values": pixels})
+        logits, *past = self.decoderInit.run(
+            None,
+            {
+                "input_ids": np.full(
+                    (len(images), 1), self.startToken, np.int64
+                ),
+                "encoder_hidden_states": hidden,
+            },
+        )
+
+        ids: list[list[int]] = [[] for _ in images]
+        done = np.zeros(len(images), bool)
+        for _ in range(self.maxLength - 1):
+            tokens = logits[:, -1].argmax(axis=-1)
+            done |= tokens == self.endToken
+            if done.all():
+                break
+            for i in np.flatnonzero(~done):
+                ids[i].append(int(tokens[i]))
+            tokens[done] = self.endToken
+            feed = {
+                "input_ids": tokens[:, None].astype(np.int64),
+                "encoder_hidden_states": hidden,
+                **{f"past_{i}": p for i, p in enumerate(past)},
+            }
+            logits, *past = self.decoderWithPast.run(
+                None, {k: v for k, v in feed.items() if k in self._pastInputs}
+            )
+        return [self.decode(tokens) for tokens in ids]
+
+
+if __name__ == "__main__":
+    from utils.constants import ONNX_MODEL_DIR
+
+    exportOnnx(ONNX_MODEL_DIR)
+    print(f"Exported to {ONNX_MODEL_DIR}")
@@ -0,0 +1,245 @@
+"""
+Cloe OCR History
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger("cloe")
+
+# Queued by close to stop the writer thread
+_STOP = object()
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY, "
+    "time REAL, text TEXT, x INTEGER, y INTEGER, width INTEGER, "
+    "height INTEGER, hash TEXT, latency REAL)",
+    "CREATE INDEX IF NOT EXISTS historyHash ON history (hash)",
+)
+
+# The trigram tokenizer matches any substring of three or more characters,
+# which suits Japanese text that has no spaces between words.
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS historyText USING fts5"
+    "(text, content='history', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS historyInsert AFTER INSERT ON history "
+    "BEGIN INSERT INTO historyText (rowid, text) VALUES (new.id, new.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS historyDelete AFTER DELETE ON history "
+    "BEGIN INSERT INTO historyText (historyText, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+)
+
+_COLUMNS = "id, time, text, x, y, width, height, hash, latency"
+
+
+class HistoryEntry(NamedTuple):
+    id: int
+    time: float
+    text: str
+    x: Optional[int]
+    y: Optional[int]
+    width: Optional[int]
+    height: Optional[int]
+    hash: str
+    latency: float
+
+
+class OCRHistory:
+    """Searchable record of every crop read or reused for the user
+
+    Args:
+        path (str): SQLite file of the history.
+        flushSize (int, optional): Queued entries that trigger a commit. Defaults to 64.
+        flushInterval (float, optional): Seconds after which queued entries
+        are committed anyway. Defaults to 1.0.
+
+    Entries are inserted by a background thread in one transaction per
+    batch. Searches and lookups use their own connection, so they never
+    wait for a write to finish.
+
+    *Note: Searches fall back to LIKE if SQLite was built without FTS5.
+    """
+
+    def __init__(self, path: str, flushSize: int = 64, flushInterval=1.0):
+        self.path = path
+        self.flushSize = flushSize
+        self.flushInterval = flushInterval
+
+        writer = sqlite3.connect(path, check_same_thread=False)
+        writer.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            writer.execute(statement)
+        try:
+            for statement in _FTS_SCHEMA:
+                writer.execute(statement)
+            self.fullText = True
+        except sqlite3.OperationalError:
+            logger.warning("FTS5 is not available, history search is slow")
+            self.fullText = False
+        writer.commit()
+
+        self._lock = threading.Lock()
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        # Entries not committed yet, so that lookups already find them
+        self._pending: dict[str, str] = {}
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, args=(writer,), name="OCRHistory", daemon=True
+        )
+        self._thread.start()
+
+    # ------------------------------------ Writes ----------------------------------- #
+
+    def add(
+        self,
+        text: str,
+        key: str,
+        latency: float,
+        region: Optional[tuple[int, int, int, int]] = None,
+    ):
+        """Queues an entry without blocking
+
+        Args:
+            text (str): Text read by the model.
+            key (str): Engine and content hash of the crop, see
+            OCRCache.contentKey.
+            latency (float): Inference time in milliseconds, 0 for a text
+            reused without inference.
+            region (tuple, optional): Screen geometry (x, y, width, height)
+            of the crop. Defaults to None.
+        """
+        x, y, width, height = region or (None, None, None, None)
+        with self._lock:
+            self._pending[key] = text
+        self._queue.put((time.time(), text, x, y, width, height, key, latency))
+
+    def addOnce(
+        self,
+        text: str,
+        key: str,
+        region: Optional[tuple[int, int, int, int]] = None,
+    ):
+        """
+        Queues a text reused without inference, unless the crop has an entry
+        """
+        # A drag reuses the same crop over and over, one row per crop is enough
+        if self.lookup(key) is None:
+            self.add(text, key, 0.0, region)
+
+    def _run(self, connection: sqlite3.Connection):
+        while True:
+            rows = [self._queue.get()]
+            deadline = time.monotonic() + self.flushInterval
+            while rows[-1] is not _STOP and len(rows) < self.flushSize:
+                try:
+                    rows.append(
+                        self._queue.get(
+                            timeout=max(0, deadline - time.monotonic())
+                        )
+                    )
+                except queue.Empty:
+                    break
+
+            stop = rows[-1] is _STOP
+            rows = [row for row in rows if row is not _STOP]
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO history (time, text, x, y, width, "
+                            "height, hash, latency) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                except sqlite3.Error:
+                    logger.exception("Could not write the OCR history")
+                with self._lock:
+                    for row in rows:
+                        if self._pending.get(row[6]) == row[1]:
+                            del self._pending[row[6]]
+            if stop:
+                connection.close()
+                return
+
+    # ------------------------------------ Reads ------------------------------------ #
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Returns the latest text of a crop with the same engine and content hash
+        """
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            row = self._reader.execute(
+                "SELECT text FROM history WHERE hash = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def search(self, query: str, limit: int = 200) -> list[HistoryEntry]:
+        """Returns the latest entries containing the query, newest first
+
+        Args:
+            query (str): Text to find. All entries match an empty query.
+            limit (int, optional): Maximum entries returned. Defaults to 200.
+        """
+        query = query.strip()
+        if not query:
+            sql = f"SELECT {_COLUMNS} FROM history ORDER BY id DESC LIMIT ?"
+            params = (limit,)
+        elif self.fullText and len(query) >= 3:
+            sql = (
+                f"SELECT {_COLUMNS} FROM history WHERE id IN "
+                "(SELECT rowid FROM historyText WHERE historyText MATCH ?) "
+                "ORDER BY id DESC LIMIT ?"
+            )
+            params = ('"' + query.replace('"', '""') + '"', limit)
+        else:
+            # Trigrams cannot match one or two characters
+            sql = (
+                f"SELECT {_COLUMNS} FROM history WHERE instr(text, ?) > 0 "
+                "ORDER BY id DESC LIMIT ?"
+            )
+            params = (query, limit)
+
+        with self._lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._reader.execute(
+                "SELECT COUNT(*) FROM history"
+            ).fetchone()[0]
+
+    def close(self, timeout: float = 5.0):
+        """
+        Commits the queued entries and closes the database
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        with self._lock:
+            self._reader.close()
@@ -0,0 +1,309 @@
+"""
+Cloe Out-of-Process Inference
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import itertools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from utils.scripts.arrayToGrayscale import arrayToGrayscale
+
+logger = logging.getLogger("cloe")
+
+
+def serve(connection: Connection, memoryName: str, slotSize: int, engine: str):
+    """Entry point of the inference process
+
+    Loads the model, reports readiness, then answers OCR requests until it
+    receives a stop message. The pixels of each request are read straight
+    from the shared memory slot named in the message. Requests sent in one
+    message are read as one batch.
+
+    Args:
+        connection (Connection): Pipe to the GUI process.
+        memoryName (str): Name of the shared memory ring.
+        slotSize (int): Size of one slot of the ring in bytes.
+        engine (str): Model weights, see loadModel.
+    """
+    from utils.scripts.loadModel import loadModel
+    from utils.scripts.recognizeBatch import recognizeBatch
+    from utils.threads import threadPolicy
+
+    memory = SharedMemory(name=memoryName)
+    try:
+        model = loadModel(engine)
+    except Exception as e:
+        connection.send(("error", None, str(e)))
+        return
+    connection.send(("ready", None, None))
+
+    while True:
+        message = connection.recv()
+        if message[0] == "stop":
+            break
+        if message[0] == "threads":
+            threadPolicy.update(**message[1])
+            threadPolicy.applyToProcess()
+            continue
+
+        requests = message[1]
+        images = [
+            Image.fromarray(
+                np.ndarray(
+                    (height, width), np.uint8, memory.buf, slot * slotSize
+                )
+            )
+            for _, slot, height, width in requests
+        ]
+        try:
+            texts = recognizeBatch(model, images)
+            for (requestId, *_), text in zip(requests, texts):
+                connection.send(("result", requestId, text))
+        except Exception as e:
+            for requestId, *_ in requests:
+                connection.send(("error", requestId, str(e)))
+        # Release the exported buffers so that the memory can be closed
+        del images
+
+    memory.close()
+
+
+class RemoteModel:
+    """Runs MangaOcr in a separate process with a callable like the model
+
+    Args:
+        slots (int): Number of crops that can be in flight at once.
+        slotSize (int): Maximum size of one grayscale crop in pixels.
+        engine (str, optional): Model weights, see loadModel. Defaults to "fp32".
+        threadPolicy (dict, optional): ThreadPolicy settings of the process.
+        Defaults to None.
+
+    Crops are written as grayscale into a ring of shared memory slots and
+    only the slot index and dimensions are sent over the pipe, so image bytes
+    are never pickled. A reader thread resolves the pending requests, and if
+    the inference process dies it is restarted without affecting the GUI.
+
+    *Note: Construction blocks until the model is loaded in the new process.
+    """
+
+    # Tells pixmapToText to pass arrays from imageToArray instead of images
+    readsArrays = True
+
+    def __init__(
+        self,
+        slots: int,
+        slotSize: int,
+        engine: str = "fp32",
+        threadPolicy: Optional[dict] = None,
+    ):
+        self.slots = slots
+        self.slotSize = slotSize
+        self.engine = engine
+        self.threadPolicy = threadPolicy
+        self._memory = SharedMemory(create=True, size=slots * slotSize)
+
+        self._lock = threading.Lock()
+        # Slots are taken for a whole batch at once under the lock, so that
+        # concurrent batches cannot each hold part of the ring and wait on
+        # each other
+        self._freeSlots = list(range(slots))
+        self._slotsFreed = threading.Condition(self._lock)
+        self._requestIds = itertools.count()
+        self._pending: dict[int, tuple[Future, int]] = {}
+        self._closing = False
+        self.restarts = 0
+        self._start()
+
+    # ----------------------------------- Process ----------------------------------- #
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        connection, childConnection = context.Pipe()
+        self._process = context.Process(
+            target=serve,
+            args=(
+                childConnection,
+                self._memory.name,
+                self.slotSize,
+                self.engine,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        # Only the child keeps its end open, so its exit ends our reads
+        childConnection.close()
+
+        kind, _, error = connection.recv()
+        if kind == "error":
+            raise RuntimeError(error)
+
+        self._connection = connection
+        if self.threadPolicy:
+            connection.send(("threads", self.threadPolicy))
+        threading.Thread(
+            target=self._readResults, args=(connection,), daemon=True
+        ).start()
+
+    def _readResults(self, connection: Connection):
+        while True:
+            try:
+                kind, requestId, payload = connection.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future, slot = self._pending.pop(requestId)
+                self._freeSlots.append(slot)
+                self._slotsFreed.notify_all()
+            if kind == "result":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+        self._onProcessExit()
+
+    def _onProcessExit(self):
+        with self._lock:
+            if self._closing:
+                return
+            pending, self._pending = self._pending, {}
+            self._freeSlots += [slot for _, slot in pending.values()]
+            self._slotsFreed.notify_all()
+        for future, _ in pending.values():
+            future.set_exception(RuntimeError("Inference process exited"))
+
+        self._process.join()
+        logger.warning(
+            "inference process exited with code %s, restarting",
+            self._process.exitcode,
+        )
+        self.restarts += 1
+        try:
+            self._start()
+        except Exception as e:
+            logger.error("could not restart the inference process: %s", e)
+
+    def close(self):
+        with self._lock:
+            self._closing = True
+        try:
+            self._connection.send(("stop",))
+        except OSError:
+            pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._memory.close()
+        self._memory.unlink()
+
+    def setThreadPolicy(self, settings: dict):
+        """
+        Applies ThreadPolicy settings to the inference process, also after restarts
+        """
+        with self._lock:
+            self.threadPolicy = settings
+            try:
+                self._connection.send(("threads", settings))
+            except OSError:
+                pass
+
+    # ----------------------------------- Requests ---------------------------------- #
+
+    def submit(self, arrays: list[np.ndarray]) -> list[Future]:
+        """Queues OCR of up to `slots` crops as one batch
+
+        Args:
+            arrays (list[np.ndarray]): Pixels as returned by imageToArray, or
+            (height, width) grayscale arrays.
+
+        Returns a future of the text of each crop.
+        """
+        if len(arrays) > self.slots:
+            raise ValueError(
+                f"Batch of {len(arrays)} crops is larger than the "
+                f"{self.slots} shared memory slots"
+            )
+        for array in arrays:
+            height, width = array.shape[:2]
+            if height * width > self.slotSize:
+                raise ValueError(
+                    f"Crop of {width}x{height} does not fit in a shared "
+                    "memory slot"
+                )
+
+        with self._slotsFreed:
+            self._slotsFreed.wait_for(
+                lambda: len(self._freeSlots) >= len(arrays)
+            )
+            slots = self._freeSlots[: len(arrays)]
+            del self._freeSlots[: len(arrays)]
+
+        requests = []
+        for array, slot in zip(arrays, slots):
+            height, width = array.shape[:2]
+            target = np.ndarray(
+                (height, width),
+                np.uint8,
+                self._memory.buf,
+                slot * self.slotSize,
+            )
+            arrayToGrayscale(array, out=target)
+            del target
+            requests.append((slot, height, width))
+
+        futures = []
+        with self._lock:
+            message = []
+            for slot, height, width in requests:
+                requestId = next(self._requestIds)
+                futures.append(Future())
+                self._pending[requestId] = (futures[-1], slot)
+                message.append((requestId, slot, height, width))
+            try:
+                self._connection.send(("ocr", message))
+            except OSError:
+                # The reader thread restarts the process; fail these requests
+                for requestId, slot, *_ in message:
+                    future, _ = self._pending.pop(requestId)
+                    self._freeSlots.append(slot)
+                    future.set_exception(
+                        RuntimeError("Inference process exited")
+                    )
+                self._slotsFreed.notify_all()
+        return futures
+
+    def batch(self, arrays: list[np.ndarray]) -> list[str]:
+        """
+        Reads the crops in batches of at most `slots` crops
+        """
+        futures = []
+        for i in range(0, len(arrays), self.slots):
+            futures += self.submit(arrays[i : i + self.slots])
+        return [future.result() for future in futures]
+
+    def __call__(self, image: Union[np.ndarray, Image.Image]) -> str:
+        if isinstance(image, Image.Image):
+            image = np.asarray(image.convert("L"))
+        return self.submit([image])[0].result()
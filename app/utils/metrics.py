@@ -0,0 +1,91 @@
+"""
+Cloe Metrics
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import statistics
+import threading
+from collections import deque
+
+# Number of latency samples kept per metric
+_SAMPLE_LIMIT = 1000
+
+
+class Metrics:
+    """
+    Thread-safe counters and latency samples shared across the app
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._samples: dict[str, deque] = {}
+        self._totals: dict[str, int] = {}
+
+    def increment(self, name: str, amount: int = 1) -> int:
+        """
+        Adds amount to the counter and returns its new value
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            return self._counters[name]
+
+    def record(self, name: str, value: float) -> int:
+        """
+        Records a latency sample (ms) and returns the number of samples so far
+        """
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=_SAMPLE_LIMIT)
+                self._totals[name] = 0
+            self._samples[name].append(value)
+            self._totals[name] += 1
+            return self._totals[name]
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def samples(self, name: str) -> list[float]:
+        with self._lock:
+            return list(self._samples.get(name, ()))
+
+    def reset(self, name: str):
+        with self._lock:
+            self._counters.pop(name, None)
+            self._samples.pop(name, None)
+            self._totals.pop(name, None)
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters and a summary (count, last, p50, p95) of the samples
+        """
+        with self._lock:
+            summary = dict(self._counters)
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                summary[name] = {
+                    "count": self._totals[name],
+                    "last": samples[-1],
+                    "p50": statistics.median(ordered),
+                    "p95": ordered[int(0.95 * (len(ordered) - 1))],
+                }
+            return summary
+
+
+metrics = Metrics()
@@ -17,7 +17,20 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+from .arrayToGrayscale import arrayToGrayscale
+from .arrayToPillow import arrayToPillow
 from .camelizeText import camelizeText
 from .colorToRGBA import colorToRGBA
+from .downscaleImage import downscaleImage
+from .grabRegion import grabRegion
+from .imageToArray import imageToArray
+from .loadModel import loadModel
 from .logText import logText
+from .pageToText import pageToText
 from .pixmapToText import pixmapToText
+from .pixmapsToText import pixmapsToText
+from .prepareCrop import prepareCrop
+from .quantizeModel import quantizeModel
+from .recognizeBatch import recognizeBatch
+from .trimImage import trimImage
+from .warmUpModel import warmUpModel
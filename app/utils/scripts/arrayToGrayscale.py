@@ -0,0 +1,63 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import sys
+from typing import Optional
+
+import numpy as np
+
+# Channel offsets of the 32-bit RGB formats in memory (0xAARRGGBB word)
+if sys.byteorder == "little":
+    _R, _G, _B = 2, 1, 0
+else:
+    _R, _G, _B = 1, 2, 3
+
+
+def arrayToGrayscale(
+    array: np.ndarray, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Computes the luminance of an array from imageToArray
+
+    The weights match Pillow's own RGB to L conversion, so the result is
+    identical to converting the image with Pillow.
+
+    Args:
+        array (np.ndarray): Pixels as returned by imageToArray.
+        out (np.ndarray, optional): uint8 array of the same height and width
+        to write the result into, e.g. a shared memory buffer. Defaults to None.
+    """
+    if out is None:
+        out = np.empty(array.shape[:2], np.uint8)
+
+    if array.ndim == 2:
+        np.copyto(out, array)
+        return out
+
+    # The products are computed in uint32 explicitly, since NumPy 1 would
+    # pick uint16 for a uint8 array times a small scalar and overflow.
+    # One scratch buffer is reused for the channels after the first.
+    gray = np.multiply(array[..., _R], 19595, dtype=np.uint32)
+    scratch = np.empty_like(gray)
+    gray += np.multiply(array[..., _G], 38470, out=scratch, dtype=np.uint32)
+    gray += np.multiply(array[..., _B], 7471, out=scratch, dtype=np.uint32)
+    gray += 0x8000
+    gray >>= 16
+    np.copyto(out, gray, casting="unsafe")
+    return out
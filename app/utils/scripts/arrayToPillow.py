@@ -0,0 +1,36 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import numpy as np
+from PIL import Image
+
+from .arrayToGrayscale import arrayToGrayscale
+
+
+def arrayToPillow(array: np.ndarray) -> Image.Image:
+    """Converts an array from imageToArray to a grayscale Pillow image
+
+    MangaOcr converts every input to grayscale before preprocessing, so the
+    luminance is computed here directly from the pixel view. This is the only
+    copy made between the QImage and the model.
+    """
+    if array.ndim == 2 and array.flags.c_contiguous:
+        return Image.fromarray(array)
+    return Image.fromarray(arrayToGrayscale(array))
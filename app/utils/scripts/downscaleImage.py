@@ -0,0 +1,51 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from utils.constants import MODEL_INPUT_LIMIT
+
+
+def downscaleImage(image: QImage, limit: int = MODEL_INPUT_LIMIT) -> QImage:
+    """Shrinks each axis of the image that is larger than limit
+
+    Args:
+        image (QImage): Crop to shrink.
+        limit (int, optional): Largest width and height. Defaults to
+        MODEL_INPUT_LIMIT.
+
+    The feature extractor of the model resizes every crop to 224x224
+    regardless of its aspect ratio, so each axis is capped on its own.
+    Capping at twice the model input leaves the final resize enough pixels
+    to antialias strokes, which keeps the result the same as on the full
+    crop. Later conversions then cost the same for any selection size.
+
+    *Note: Smaller images are returned as is.
+    """
+    w, h = image.width(), image.height()
+    if w <= limit and h <= limit:
+        return image
+    return image.scaled(
+        min(w, limit),
+        min(h, limit),
+        Qt.IgnoreAspectRatio,
+        Qt.SmoothTransformation,
+    )
@@ -0,0 +1,47 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from PyQt5.QtCore import QPoint, QRect
+from PyQt5.QtGui import QImage, QScreen
+
+
+def grabRegion(screen: QScreen, rect: QRect, padding: int = 0) -> QImage:
+    """Captures only a rectangle of the screen
+
+    Args:
+        screen (QScreen): Screen to capture.
+        rect (QRect): Area to capture, in logical pixels relative to the
+        top-left corner of the screen.
+        padding (int, optional): Logical pixels added around the area,
+        clipped to the screen. Defaults to 0.
+
+    Grabbing the whole screen copies every pixel of it to read a small
+    selection. The platform grabs only the requested area instead.
+
+    *Note: The image has the physical resolution of the screen, it is not
+    scaled to logical pixels.
+    """
+    bounds = QRect(QPoint(0, 0), screen.size())
+    rect = rect.adjusted(-padding, -padding, padding, padding) & bounds
+    if rect.isEmpty():
+        return QImage()
+    return screen.grabWindow(
+        0, rect.x(), rect.y(), rect.width(), rect.height()
+    ).toImage()
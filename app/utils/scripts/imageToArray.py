@@ -0,0 +1,58 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+# Formats whose pixels are stored as one 32-bit word (0xAARRGGBB)
+_RGB32_FORMATS = (
+    QImage.Format_RGB32,
+    QImage.Format_ARGB32,
+    QImage.Format_ARGB32_Premultiplied,
+)
+
+
+def imageToArray(image: QImage) -> np.ndarray:
+    """Wraps the pixel buffer of a QImage as a NumPy array without copying
+
+    Images in a 32-bit RGB format are returned as a (height, width, 4) view
+    whose last axis is the in-memory byte order (B, G, R, A on little-endian
+    machines). Grayscale8 images are returned as a (height, width) view.
+    Any other format is converted to RGB32 and copied into an array that
+    owns its memory.
+
+    *Note: For RGB32 and Grayscale8 images the array does not own its memory.
+    Keep a reference to the image for as long as the array is in use.
+    """
+    if image.isNull():
+        return np.empty((0, 0, 4), np.uint8)
+    if image.format() not in _RGB32_FORMATS + (QImage.Format_Grayscale8,):
+        converted = image.convertToFormat(QImage.Format_RGB32)
+        return imageToArray(converted).copy()
+
+    h, w, stride = image.height(), image.width(), image.bytesPerLine()
+    bits = image.constBits()
+    bits.setsize(h * stride)
+
+    # Rows are padded to bytesPerLine, so view the full stride and slice
+    # the padding off instead of copying row by row.
+    buffer = np.frombuffer(bits, np.uint8).reshape(h, stride)
+    if image.format() == QImage.Format_Grayscale8:
+        return buffer[:, :w]
+    return buffer[:, : w * 4].reshape(h, w, 4)
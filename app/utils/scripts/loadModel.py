@@ -0,0 +1,101 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import os
+from typing import TYPE_CHECKING, Optional
+
+from utils.constants import ONNX_MODEL_DIR, QUANTIZED_MODEL_FILE
+from utils.threads import threadPolicy
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+logger = logging.getLogger("cloe")
+
+
+def loadModel(
+    engine: str = "fp32", cachePath: str = QUANTIZED_MODEL_FILE
+) -> "MangaOcr":
+    """Imports and loads the MangaOcr model
+
+    Args:
+        engine (str, optional): "fp32" for the original weights, "int8"
+        for dynamically quantized weights, or "onnx" for ONNX Runtime.
+        Defaults to "fp32".
+        cachePath (str, optional): Quantized model saved by an earlier launch.
+        Defaults to QUANTIZED_MODEL_FILE.
+
+    The engine is kept as model.engine, so that cached and recorded texts
+    are only reused by the engine that read them.
+
+    *Note: Importing manga_ocr pulls in torch and transformers, which takes
+    seconds. Call this from a worker thread, never at module level.
+    """
+    model = _loadModel(engine, cachePath)
+    model.engine = engine
+    return model
+
+
+def _loadModel(engine: str, cachePath: str) -> "MangaOcr":
+    if engine == "onnx":
+        # Only the export needs torch, so check for the graphs first
+        from utils.engine import OnnxModel, exportOnnx
+
+        if not os.path.exists(os.path.join(ONNX_MODEL_DIR, "config.json")):
+            exportOnnx(ONNX_MODEL_DIR)
+        model = OnnxModel(ONNX_MODEL_DIR)
+        # onnxruntime keeps its own thread pool, which torch settings miss
+        threadPolicy.track(model)
+        return model
+
+    from manga_ocr import MangaOcr
+
+    if engine == "int8":
+        cached = _loadQuantized(cachePath)
+        if cached is not None:
+            return cached
+
+    model = MangaOcr()
+    if engine == "int8":
+        from .quantizeModel import quantizeModel
+
+        quantizeModel(model, cachePath)
+    return model
+
+
+def _loadQuantized(cachePath: str) -> Optional["MangaOcr"]:
+    if not os.path.exists(cachePath):
+        return None
+
+    import torch
+
+    from .quantizeModel import cacheKey
+
+    try:
+        # The whole model is pickled, so that neither the fp32 weights nor
+        # quantization are needed. Only quantizeModel writes this file.
+        cached = torch.load(cachePath, weights_only=False)
+        if cached["key"] == cacheKey():
+            return cached["model"]
+        logger.info("quantized model is stale, quantizing again")
+    except Exception as e:
+        logger.warning("could not load the quantized model: %s", e)
+    return None
@@ -17,23 +17,35 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from os import path as osPath
+from typing import Optional
 
+from PyQt5.QtCore import QRect
 from PyQt5.QtGui import QGuiApplication
 
+from utils.writer import textLog
 
-def logText(text: str, *, saveLog=False, path=".") -> None:
+
+def logText(
+    text: str, *, saveLog=False, region: Optional[QRect] = None
+) -> None:
     """Helper function to log text
 
     Args:
         text (str): Text to log
-        saveLog (bool, optional): Save text to a file if enabled. Defaults to False.
-        path (str, optional): Log file location. Defaults to current path.
+        saveLog (bool, optional): Save text to the log file if enabled. Defaults to False.
+        region (QRect, optional): Screen region the text was read from. Defaults to None.
+
+    *Note: The entry is only queued, the log file is written by a background thread.
     """
     clipboard = QGuiApplication.clipboard()
     clipboard.setText(text)
-
     if saveLog:
-        filename = "log.txt"
-        with open(osPath.join(path, filename), "a", encoding="utf-8") as fh:
-            fh.write(text + "\n")
+        entry = {"text": text}
+        if region is not None:
+            entry["region"] = [
+                region.x(),
+                region.y(),
+                region.width(),
+                region.height(),
+            ]
+        textLog.write(entry)
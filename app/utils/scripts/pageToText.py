@@ -0,0 +1,84 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import time
+from typing import TYPE_CHECKING, Optional
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QImage
+
+from .imageToArray import imageToArray
+from .pixmapsToText import pixmapsToText
+from utils.bubbles import findTextRegions
+from utils.cache import OCRCache
+from utils.history import OCRHistory
+from utils.metrics import metrics
+from utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+
+def pageToText(
+    image: QImage,
+    model: Optional["MangaOcr"] = None,
+    cache: Optional[OCRCache] = None,
+    history: Optional[OCRHistory] = None,
+    origin: tuple[int, int] = (0, 0),
+    scale: float = 1.0,
+) -> tuple[list[QRect], list[str]]:
+    """Finds the text regions of a page and reads them in one batch
+
+    Args:
+        image (QImage): Frame of the page.
+        model (MangaOcr, optional): OCR model. Defaults to None.
+        cache (OCRCache, optional): Results of previously read crops. Defaults to None.
+        history (OCRHistory, optional): Records every read and serves crops
+        read before. Defaults to None.
+        origin (tuple[int, int], optional): Screen position of the frame,
+        to store the screen geometry of each region. Defaults to (0, 0).
+        scale (float, optional): Pixels of the frame per logical pixel of
+        the screen. Defaults to 1.0.
+
+    Returns the regions in pixels of the frame, in reading order, and
+    their texts.
+    """
+    start = time.perf_counter()
+    with tracer.span("findTextRegions"):
+        boxes = findTextRegions(imageToArray(image))
+    metrics.record("pageDetection", (time.perf_counter() - start) * 1000)
+
+    rects = [QRect(*box) for box in boxes]
+    texts = pixmapsToText(
+        [image.copy(rect) for rect in rects],
+        model,
+        cache,
+        history=history,
+        regions=[
+            (
+                origin[0] + round(x / scale),
+                origin[1] + round(y / scale),
+                round(w / scale),
+                round(h / scale),
+            )
+            for x, y, w, h in boxes
+        ],
+    )
+    return rects, texts
@@ -17,32 +17,132 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from io import BytesIO
-from typing import Optional
 
-from manga_ocr import MangaOcr
-from PIL import Image
-from PyQt5.QtCore import QBuffer
-from PyQt5.QtGui import QPixmap
+import logging
+import time
+from typing import TYPE_CHECKING, Optional, Union
 
+from PyQt5.QtGui import QImage, QPixmap
 
-def pixmapToText(pixmap: QPixmap, model: Optional[MangaOcr] = None) -> str:
-    """
-    Convert QPixmap object to text using the model
+from .arrayToPillow import arrayToPillow
+from .imageToArray import imageToArray
+from .prepareCrop import prepareCrop
+from utils.cache import OCRCache
+from utils.change import ChangeDetector
+from utils.history import OCRHistory
+from utils.metrics import Metrics, metrics
+from utils.tracing import tracer
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+logger = logging.getLogger("cloe")
+
+
+def pixmapToText(
+    image: Union[QImage, QPixmap],
+    model: Optional["MangaOcr"] = None,
+    cache: Optional[OCRCache] = None,
+    detector: Optional[ChangeDetector] = None,
+    history: Optional[OCRHistory] = None,
+    region: Optional[tuple[int, int, int, int]] = None,
+    sessionMetrics: Optional[Metrics] = None,
+) -> str:
+    """Convert an image to text using the model
+
+    Args:
+        image (QImage | QPixmap): Crop to read. Pass a QImage when calling
+        from a worker thread, since QPixmap may only be used on the GUI thread.
+        model (MangaOcr, optional): OCR model. Defaults to None.
+        cache (OCRCache, optional): Results of previously read crops. Defaults to None.
+        detector (ChangeDetector, optional): Reuses the previous text if the
+        crop shows the same content. Defaults to None.
+        history (OCRHistory, optional): Records each crop returned once and
+        serves crops read before. Defaults to None.
+        region (tuple, optional): Screen geometry of the crop, stored in the
+        history. Defaults to None.
+        sessionMetrics (Metrics, optional): Also counts the crops here, such
+        as per snipping session. Defaults to None.
+
+    A text reused from the detector or the cache is recorded with a latency
+    of 0, unless the history already has the crop. Crops are keyed by
+    model.engine as well as their content.
     """
+    if isinstance(image, QPixmap):
+        image = image.toImage()
 
-    buffer = QBuffer()
-    buffer.open(QBuffer.ReadWrite)
-    pixmap.save(buffer, "PNG")
-    bytes = BytesIO(buffer.data())
+    if image.isNull():
+        return ""
+
+    def count(name: str):
+        metrics.increment(name)
+        if sessionMetrics is not None:
+            sessionMetrics.increment(name)
 
-    if bytes.getbuffer().nbytes == 0:
+    count("crops")
+    prepared = prepareCrop(image)
+    if prepared is None:
+        count("blankCrops")
         return ""
 
-    pillowImage = Image.open(bytes)
-    text = ""
+    # The array is a view, so keep the prepared image referenced
+    image, scale = prepared
+    array = imageToArray(image)
+    engine = getattr(model, "engine", "")
+
+    def reused(text: str, key: Optional[str] = None) -> str:
+        if history is not None and text:
+            key = key or OCRCache.contentKey(array, engine)
+            history.addOnce(text, key, region)
+        return text
+
+    if detector is not None:
+        text, signature = detector.lookup(array, scale)
+        if text is not None:
+            count("unchangedCrops")
+            return reused(text)
 
-    if model is not None:
-        text = model(pillowImage)
+    if cache is not None:
+        keys = cache.keys(array, engine)
+        text = cache.get(keys)
+        if text is not None:
+            if detector is not None:
+                detector.remember(signature, text)
+            return reused(text, keys[0])
+
+    if history is not None:
+        key = (
+            keys[0]
+            if cache is not None
+            else OCRCache.contentKey(array, engine)
+        )
+        text = history.lookup(key)
+        if text is not None:
+            count("historyHits")
+            if cache is not None:
+                cache.put(keys, text)
+            if detector is not None:
+                detector.remember(signature, text)
+            # Found in the history, so the crop already has an entry
+            return text
+
+    if model is None:
+        return ""
 
-    return text.strip()
+    start = time.perf_counter()
+    if getattr(model, "readsArrays", False):
+        text = model(array).strip()
+    else:
+        text = model(arrayToPillow(array)).strip()
+    end = time.perf_counter()
+    tracer.add("inference", start, end)
+    elapsed = (end - start) * 1000
+    if metrics.record("inference", elapsed) == 1:
+        logger.info("first inference took %.0f ms", elapsed)
+    if cache is not None:
+        cache.put(keys, text)
+    if history is not None and text:
+        history.add(text, key, elapsed, region)
+    if detector is not None:
+        detector.remember(signature, text)
+    return text
@@ -0,0 +1,118 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import time
+from typing import TYPE_CHECKING, Optional
+
+from PyQt5.QtGui import QImage
+
+from .arrayToPillow import arrayToPillow
+from .imageToArray import imageToArray
+from .prepareCrop import prepareCrop
+from .recognizeBatch import recognizeBatch
+from utils.cache import OCRCache
+from utils.history import OCRHistory
+from utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+
+def pixmapsToText(
+    images: list[QImage],
+    model: Optional["MangaOcr"] = None,
+    cache: Optional[OCRCache] = None,
+    history: Optional[OCRHistory] = None,
+    regions: Optional[list[tuple[int, int, int, int]]] = None,
+) -> list[str]:
+    """Convert several images to text with a single batched model pass
+
+    Args:
+        images (list[QImage]): Crops to read.
+        model (MangaOcr, optional): OCR model. Defaults to None.
+        cache (OCRCache, optional): Results of previously read crops. Defaults to None.
+        history (OCRHistory, optional): Records each crop returned once and
+        serves crops read before. Defaults to None.
+        regions (list[tuple], optional): Screen geometry of each crop, stored
+        in the history. Defaults to None.
+
+    Blank crops and crops found in the cache or the history are not sent
+    to the model. Texts from the cache are recorded with a latency of 0,
+    unless the history already has the crop. Crops are keyed by
+    model.engine as well as their content.
+    """
+    texts = [""] * len(images)
+    # Blank crops trim to None and are not read.
+    # The arrays are views, so keep the prepared images referenced.
+    prepared = [prepareCrop(image) for image in images]
+    images = [None if crop is None else crop[0] for crop in prepared]
+    arrays = [
+        None if image is None else imageToArray(image) for image in images
+    ]
+
+    engine = getattr(model, "engine", "")
+    regions = regions or [None] * len(images)
+    misses: list[int] = []
+    keys = {}
+    hashes = {}
+    for i, array in enumerate(arrays):
+        if array is None:
+            continue
+        if cache is not None:
+            keys[i] = cache.keys(array, engine)
+            hashes[i] = keys[i][0]
+            text = cache.get(keys[i])
+            if text is not None:
+                texts[i] = text
+                if history is not None and text:
+                    history.addOnce(text, hashes[i], regions[i])
+                continue
+        if history is not None:
+            if i not in hashes:
+                hashes[i] = OCRCache.contentKey(array, engine)
+            text = history.lookup(hashes[i])
+            if text is not None:
+                metrics.increment("historyHits")
+                texts[i] = text
+                if cache is not None:
+                    cache.put(keys[i], text)
+                continue
+        misses.append(i)
+
+    if model is None or not misses:
+        return texts
+
+    start = time.perf_counter()
+    if getattr(model, "readsArrays", False):
+        results = model.batch([arrays[i] for i in misses])
+    else:
+        results = recognizeBatch(
+            model, [arrayToPillow(arrays[i]) for i in misses]
+        )
+    elapsed = (time.perf_counter() - start) * 1000
+    metrics.record("batchInference", elapsed)
+
+    for i, text in zip(misses, results):
+        texts[i] = text.strip()
+        if cache is not None:
+            cache.put(keys[i], texts[i])
+        if history is not None and texts[i]:
+            history.add(texts[i], hashes[i], elapsed / len(misses), regions[i])
+    return texts
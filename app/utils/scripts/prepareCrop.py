@@ -0,0 +1,51 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from typing import Optional
+
+from PyQt5.QtGui import QImage
+
+from .downscaleImage import downscaleImage
+from .trimImage import trimImage
+
+
+def prepareCrop(image: QImage) -> Optional[tuple[QImage, tuple[float, float]]]:
+    """Trims a crop to its ink and downscales it the way the model reads it
+
+    Args:
+        image (QImage): Crop to prepare.
+
+    Returns the prepared image and the factors (x, y) the trimmed crop was
+    downscaled by. Every path that reads a crop goes through here, so that
+    the snipping window, the page reader and the command line return the
+    same text for the same image.
+
+    *Note: Returns None if the image has no ink.
+    """
+    # Trimmed first, so that the downscale limit applies to the ink only
+    image = trimImage(image)
+    if image is None:
+        return None
+    size = image.size()
+    image = downscaleImage(image)
+    return image, (
+        image.width() / size.width(),
+        image.height() / size.height(),
+    )
@@ -0,0 +1,72 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+logger = logging.getLogger("cloe")
+
+
+def quantizeModel(model: "MangaOcr", path: str = None) -> "MangaOcr":
+    """Applies dynamic int8 quantization to the linear layers of the model
+
+    Args:
+        model (MangaOcr): Model to quantize in place.
+        path (str, optional): File to save the quantized model to, so that
+        loadModel can skip quantization on the next launch. Defaults to None.
+
+    Both the ViT encoder and the BERT decoder are quantized. Weights are
+    stored as int8 and activations are quantized on the fly, which speeds up
+    CPU inference and shrinks the weights to about a quarter.
+
+    *Note: Quantized layers only run on the CPU.
+    """
+    import torch
+
+    model.model = torch.quantization.quantize_dynamic(
+        model.model.cpu(), {torch.nn.Linear}, dtype=torch.qint8
+    )
+    if path:
+        try:
+            # Other processes may be loading the file, so replace it whole
+            temporary = f"{path}.{os.getpid()}.tmp"
+            torch.save({"key": cacheKey(), "model": model}, temporary)
+            os.replace(temporary, path)
+        except Exception as e:
+            logger.warning("could not cache the quantized model: %s", e)
+    return model
+
+
+def cacheKey() -> dict:
+    """
+    Returns the library versions a saved quantized model is only valid for
+    """
+    import torch
+    import transformers
+
+    # Quantized layers and pickled modules are not portable across versions
+    return {
+        "torch": str(torch.__version__),
+        "transformers": transformers.__version__,
+    }
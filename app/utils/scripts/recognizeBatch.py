@@ -0,0 +1,57 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from manga_ocr import MangaOcr
+
+
+def recognizeBatch(model: "MangaOcr", images: list[Image.Image]) -> list[str]:
+    """Reads several crops with one encoder pass and one batched generate
+
+    The feature extractor resizes every crop to the same square input, so
+    the crops stack without padding. generate pads the token sequences of
+    the batch, and the padding is dropped when decoding.
+
+    Models with their own batch method, such as OnnxModel, are handed the
+    whole batch. Other models are called once per crop.
+    """
+    if not images:
+        return []
+    if hasattr(model, "batch"):
+        return model.batch(images)
+    if not hasattr(model, "feature_extractor"):
+        return [model(image) for image in images]
+
+    from manga_ocr.ocr import post_process
+
+    # Same preprocessing as MangaOcr.__call__
+    images = [image.convert("L").convert("RGB") for image in images]
+    pixelValues = model.feature_extractor(
+        images, return_tensors="pt"
+    ).pixel_values
+    output = model.model.generate(
+        pixelValues.to(model.model.device), max_length=300
+    ).cpu()
+    texts = model.tokenizer.batch_decode(output, skip_special_tokens=True)
+    return [post_process(text) for text in texts]
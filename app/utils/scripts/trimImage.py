@@ -0,0 +1,56 @@
+"""
+Cloe Helper Functions
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from typing import Optional
+
+from PyQt5.QtGui import QImage
+
+from .imageToArray import imageToArray
+from utils.change import inkBox
+from utils.constants import CROP_MARGIN
+
+
+def trimImage(image: QImage, margin: int = CROP_MARGIN) -> Optional[QImage]:
+    """Crops the image to the bounding box of its ink plus a margin
+
+    Args:
+        image (QImage): Crop to trim.
+        margin (int, optional): Pixels kept around the ink. Defaults to
+        CROP_MARGIN.
+
+    The model resizes every crop to a fixed input, so blank background
+    around the text only costs resolution. Selections that differ only in
+    the blank area around the same text trim to the same image.
+
+    *Note: Returns None if the image has no ink.
+    """
+    if image.isNull():
+        return None
+    box = inkBox(imageToArray(image))
+    if box is None:
+        return None
+
+    x, y, w, h = box
+    left, top = max(0, x - margin), max(0, y - margin)
+    right = min(image.width(), x + w + margin)
+    bottom = min(image.height(), y + h + margin)
+    if (left, top, right, bottom) == (0, 0, image.width(), image.height()):
+        return image
+    return image.copy(left, top, right - left, bottom - top)
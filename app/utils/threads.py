@@ -0,0 +1,325 @@
+"""
+Cloe Thread Policy
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import os
+import sys
+import threading
+import weakref
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger("cloe")
+
+# Windows priority values (BELOW_NORMAL_PRIORITY_CLASS, THREAD_PRIORITY_*)
+_BELOW_NORMAL_CLASS = 0x4000
+_NORMAL_CLASS = 0x20
+_THREAD_BELOW_NORMAL = -1
+_THREAD_NORMAL = 0
+
+# Niceness added on Linux and macOS for low priority
+_LOW_PRIORITY_NICE = 10
+
+# Name given to a thread while it runs model work. Threads inherit the name
+# of the thread that starts them, which tells the threads torch starts for
+# the model apart from threads other parts of the app start meanwhile.
+_INFERENCE_THREAD_NAME = "cloe-inference"
+# Prefix of the thread pools torch names itself
+_TORCH_THREAD_PREFIX = "pt_"
+
+
+# Cores the process may run on, read before any thread is pinned. Asking
+# a pinned thread would only return its own cores.
+if hasattr(os, "sched_getaffinity"):
+    _PROCESS_CORES = sorted(os.sched_getaffinity(0))
+else:
+    _PROCESS_CORES = list(range(os.cpu_count() or 1))
+
+
+def availableCores() -> list[int]:
+    return list(_PROCESS_CORES)
+
+
+def inferenceCores(reserved: int) -> list[int]:
+    """
+    Returns the cores left for inference after reserving the first ones for the UI
+    """
+    cores = availableCores()
+    return cores[reserved:] or cores[-1:]
+
+
+def processThreadIds() -> set[int]:
+    """Returns the native ids of the threads of the process
+
+    *Note: Only supported on Linux, elsewhere the set is empty.
+    """
+    try:
+        return {int(tid) for tid in os.listdir("/proc/self/task")}
+    except OSError:
+        return set()
+
+
+def threadName(tid: int) -> Optional[str]:
+    """Returns the name of a thread of the process
+
+    *Note: Only supported on Linux, elsewhere None is returned.
+    """
+    try:
+        with open(f"/proc/self/task/{tid}/comm") as fh:
+            return fh.read().rstrip("\n")
+    except OSError:
+        return None
+
+
+def setThreadName(tid: int, name: str):
+    """
+    Renames a thread of the process, on Linux
+    """
+    try:
+        with open(f"/proc/self/task/{tid}/comm", "w") as fh:
+            fh.write(name)
+    except OSError:
+        pass
+
+
+def _threadIds(wholeProcess: bool, threads: Iterable[int]) -> set[int]:
+    # Linux affinity and niceness are per thread, so the process-wide
+    # version walks every thread of the process
+    if wholeProcess:
+        return processThreadIds()
+    return {threading.get_native_id(), *threads}
+
+
+def setAffinity(
+    cores: list[int], wholeProcess: bool = False, threads: Iterable[int] = ()
+):
+    """Pins the current thread, or every thread of the process, to cores
+
+    Args:
+        cores (list[int]): Cores to run on.
+        wholeProcess (bool, optional): Pin every thread. Defaults to False.
+        threads (Iterable[int], optional): Native ids of other threads to
+        pin with the current one, on Linux. Defaults to ().
+
+    *Note: Not supported on macOS, where this does nothing.
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        mask = sum(1 << core for core in cores)
+        if wholeProcess:
+            kernel32.SetProcessAffinityMask(kernel32.GetCurrentProcess(), mask)
+        else:
+            kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), mask)
+    elif hasattr(os, "sched_setaffinity"):
+        for tid in _threadIds(wholeProcess, threads):
+            try:
+                os.sched_setaffinity(tid, cores)
+            except ProcessLookupError:
+                # The thread exited since its id was read
+                pass
+
+
+def setLowPriority(
+    low: bool, wholeProcess: bool = False, threads: Iterable[int] = ()
+):
+    """Lowers or restores the scheduling priority of the current thread or process
+
+    See setAffinity for the arguments.
+
+    *Note: On Linux and macOS, restoring the priority needs privileges, so it
+    fails until the app is restarted.
+    """
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        if wholeProcess:
+            kernel32.SetPriorityClass(
+                kernel32.GetCurrentProcess(),
+                _BELOW_NORMAL_CLASS if low else _NORMAL_CLASS,
+            )
+        else:
+            kernel32.SetThreadPriority(
+                kernel32.GetCurrentThread(),
+                _THREAD_BELOW_NORMAL if low else _THREAD_NORMAL,
+            )
+        return
+
+    nice = _LOW_PRIORITY_NICE if low else 0
+    if sys.platform == "linux":
+        ids = _threadIds(wholeProcess, threads)
+    else:
+        ids = {0}
+    for tid in ids:
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, nice)
+        except ProcessLookupError:
+            pass
+
+
+class ThreadPolicy:
+    """Thread counts, affinity and priority of the inference threads
+
+    The thread counts are applied to torch process-wide, through
+    torch.set_num_threads. Affinity and priority are applied to a whole
+    inference process through applyToProcess. In the GUI process they are
+    applied only to model work run through runInference: the calling thread
+    and the threads torch started from it, such as its OpenMP pool, so that
+    the UI threads keep every core and their priority.
+
+    Thread counts of 0 keep the torch default, capped to the cores that are
+    not reserved for the UI. Models with their own thread pool, such as
+    OnnxModel, follow the intra-op count once passed to track.
+
+    *Note: Outside Linux, the threads torch starts cannot be found, and only
+    the calling thread is pinned in the GUI process.
+    """
+
+    def __init__(self):
+        self.intraOpThreads = 0
+        self.interOpThreads = 0
+        self.reservedCores = 0
+        self.cpuAffinity = False
+        self.lowPriority = False
+        self._version = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._torchThreads: set[int] = set()
+        self._torchDefaults: Optional[tuple[int, int]] = None
+        self._models = weakref.WeakSet()
+
+    def settings(self) -> dict:
+        return {
+            "intraOpThreads": self.intraOpThreads,
+            "interOpThreads": self.interOpThreads,
+            "reservedCores": self.reservedCores,
+            "cpuAffinity": self.cpuAffinity,
+            "lowPriority": self.lowPriority,
+        }
+
+    def update(self, **settings):
+        """
+        Changes the policy and applies the thread counts right away
+        """
+        for key, value in settings.items():
+            setattr(self, key, value)
+        self._version += 1
+        self.applyThreadCounts()
+
+    def threadCount(self, requested: int, default: int) -> int:
+        if requested > 0:
+            return requested
+        return max(1, min(default, len(inferenceCores(self.reservedCores))))
+
+    def track(self, model):
+        """
+        Applies the intra-op thread count to a model through model.setThreads
+        """
+        self._models.add(model)
+        self.applyThreadCounts()
+
+    def applyThreadCounts(self):
+        for model in list(self._models):
+            model.setThreads(
+                self.threadCount(self.intraOpThreads, len(availableCores()))
+            )
+
+        # Importing torch takes seconds, so only touch it once it is loaded
+        torch = sys.modules.get("torch")
+        if torch is None:
+            return
+        if self._torchDefaults is None:
+            self._torchDefaults = (
+                torch.get_num_threads(),
+                torch.get_num_interop_threads(),
+            )
+        intraDefault, interDefault = self._torchDefaults
+        torch.set_num_threads(
+            self.threadCount(self.intraOpThreads, intraDefault)
+        )
+        interOp = self.threadCount(self.interOpThreads, interDefault)
+        if torch.get_num_interop_threads() != interOp:
+            try:
+                torch.set_num_interop_threads(interOp)
+            except RuntimeError:
+                # Only allowed before the first inter-op parallel work
+                logger.info("inter-op threads apply after a restart")
+
+    def apply(self, wholeProcess: bool, threads: Iterable[int] = ()):
+        cores = availableCores()
+        if self.cpuAffinity:
+            cores = inferenceCores(self.reservedCores)
+        try:
+            setAffinity(cores, wholeProcess, threads)
+            setLowPriority(self.lowPriority, wholeProcess, threads)
+        except (OSError, AttributeError) as e:
+            logger.warning("could not apply the thread policy: %s", e)
+
+    def runInference(self, fn: Callable, *args, **kwargs):
+        """Runs model work on the calling thread under the policy
+
+        The calling thread is renamed while fn runs. Threads started in the
+        meantime that inherited the name, or that torch named, are
+        remembered as torch threads and follow the policy whenever it
+        changes.
+        """
+        if getattr(self._local, "version", 0) != self._version:
+            self._local.version = self._version
+            with self._lock:
+                self._torchThreads &= processThreadIds()
+                torchThreads = set(self._torchThreads)
+            self.apply(wholeProcess=False, threads=torchThreads)
+
+        tid = threading.get_native_id()
+        name = threadName(tid)
+        if name is not None:
+            setThreadName(tid, _INFERENCE_THREAD_NAME)
+        before = processThreadIds()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            started = {
+                thread
+                for thread in processThreadIds() - before
+                if self._isTorchThread(thread)
+            }
+            if name is not None:
+                setThreadName(tid, name)
+            if started:
+                # Started by this thread, so they inherited its policy
+                with self._lock:
+                    self._torchThreads |= started
+
+    @staticmethod
+    def _isTorchThread(tid: int) -> bool:
+        # Threads started by other threads of the app meanwhile, such as
+        # the log writer or pool workers, carry their own names
+        name = threadName(tid) or ""
+        return name == _INFERENCE_THREAD_NAME or name.startswith(
+            _TORCH_THREAD_PREFIX
+        )
+
+    def applyToProcess(self):
+        self.applyThreadCounts()
+        self.apply(wholeProcess=True)
+
+
+threadPolicy = ThreadPolicy()
@@ -0,0 +1,53 @@
+"""
+Cloe Timelines
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import time
+
+logger = logging.getLogger("cloe")
+
+
+class Timeline:
+    """Records named milestones relative to the creation of the timeline
+
+    Args:
+        name (str): Name shown in front of every logged milestone
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.marks: dict[str, float] = {}
+
+    def mark(self, label: str) -> float:
+        """
+        Logs and returns the time (ms) from the start to this milestone
+        """
+        elapsed = (time.perf_counter() - self.start) * 1000
+        self.marks[label] = elapsed
+        logger.info("%s: %s after %.0f ms", self.name, label, elapsed)
+        return elapsed
+
+    def summary(self) -> str:
+        return ", ".join(f"{k}={v:.0f}ms" for k, v in self.marks.items())
+
+
+# Started as soon as main.py imports this module
+startupTimeline = Timeline("startup")
@@ -0,0 +1,154 @@
+"""
+Cloe Tracing
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from utils.constants import TRACE_BUFFER_SIZE
+
+
+class _NoSpan:
+    """
+    Shared do-nothing span returned while tracing is off
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, tracer: "Tracer", name: str, snip: Optional[int]):
+        self.tracer = tracer
+        self.name = name
+        self.snip = snip
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.start, time.perf_counter(), self.snip)
+        return False
+
+
+class Tracer:
+    """Records timed spans of a snip across threads into a ring buffer
+
+    Args:
+        size (int): Maximum number of spans kept. Older spans are dropped.
+
+    Each hotkey press starts a new snip, and every span records the id of
+    the snip it belongs to and the thread it ran on. The buffer can be
+    exported as a Chrome trace (chrome://tracing or ui.perfetto.dev).
+
+    *Note: While disabled, span() returns a shared no-op object, so
+    instrumented code only pays for an attribute check.
+    """
+
+    def __init__(self, size: int):
+        self.enabled = False
+        self.snip: Optional[int] = None
+        self._events: deque = deque(maxlen=size)
+        self._threads: dict[int, str] = {}
+        self._snips = itertools.count(1)
+
+    def newSnip(self) -> Optional[int]:
+        """
+        Starts a new snip and returns its correlation id
+        """
+        if not self.enabled:
+            return None
+        self.snip = next(self._snips)
+        return self.snip
+
+    def span(self, name: str, snip: Optional[int] = None):
+        """Returns a context manager that times its body
+
+        Args:
+            name (str): Name shown in the trace.
+            snip (int, optional): Snip the span belongs to. Defaults to the
+            current snip, pass it explicitly for work started on another thread.
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, self.snip if snip is None else snip)
+
+    def add(
+        self, name: str, start: float, end: float, snip: Optional[int] = None
+    ):
+        """
+        Records a span from perf_counter() timestamps start to end
+        """
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        # deque.append is atomic, so spans from any thread need no lock
+        self._threads[thread.ident] = thread.name
+        self._events.append((name, start, end, thread.ident, snip))
+
+    def clear(self):
+        self._events.clear()
+
+    def export(self, path: str) -> int:
+        """
+        Writes the buffered spans as Chrome trace JSON and returns their count
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._threads.items())
+        ]
+        spans = list(self._events)
+        for name, start, end, tid, snip in spans:
+            events.append(
+                {
+                    "name": name,
+                    "cat": "snip",
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"snip": snip},
+                }
+            )
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+        return len(spans)
+
+
+tracer = Tracer(TRACE_BUFFER_SIZE)
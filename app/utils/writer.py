@@ -0,0 +1,164 @@
+"""
+Cloe Log Writer
+
+Copyright (C) `2021-2022` `<Alarcon Ace Belen>`
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+from utils.constants import (
+    LOG_BACKUPS,
+    LOG_FILE,
+    LOG_FLUSH_INTERVAL,
+    LOG_FLUSH_SIZE,
+    LOG_MAX_BYTES,
+)
+
+logger = logging.getLogger("cloe")
+
+# Queued by close to stop the writer thread
+_STOP = object()
+
+
+class LogWriter:
+    """Appends JSON lines to a file from a background thread
+
+    Args:
+        path (str): File to append to.
+        maxBytes (int): Size after which the file is rotated.
+        backups (int): Rotated files kept as path.1 ... path.N.
+        flushSize (int): Buffered entries that trigger a write.
+        flushInterval (float): Seconds after which buffered entries are
+        written anyway.
+
+    write only puts the entry on a queue, so callers never wait on the
+    disk. Each batch is written with one call and fsynced.
+
+    *Note: The thread is started by the first write.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        maxBytes: int,
+        backups: int,
+        flushSize: int,
+        flushInterval: float,
+    ):
+        self.path = path
+        self.maxBytes = maxBytes
+        self.backups = backups
+        self.flushSize = flushSize
+        self.flushInterval = flushInterval
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def write(self, entry: dict):
+        """
+        Queues an entry, stamped with the current time, without blocking
+        """
+        entry = {"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **entry}
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="LogWriter", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(entry)
+
+    def close(self, timeout: float = 5.0):
+        """
+        Writes the queued entries and stops the thread
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    # ------------------------------------ Thread ----------------------------------- #
+
+    def _run(self):
+        buffer: list[str] = []
+        deadline = None
+        while True:
+            try:
+                if deadline is None:
+                    entry = self._queue.get()
+                else:
+                    entry = self._queue.get(
+                        timeout=max(0, deadline - time.monotonic())
+                    )
+            except queue.Empty:
+                entry = None
+
+            if entry is _STOP:
+                self._flush(buffer)
+                return
+            if entry is not None:
+                buffer.append(json.dumps(entry, ensure_ascii=False) + "\n")
+                if deadline is None:
+                    deadline = time.monotonic() + self.flushInterval
+
+            if len(buffer) >= self.flushSize or entry is None:
+                self._flush(buffer)
+                buffer = []
+                deadline = None
+
+    def _flush(self, lines: list[str]):
+        if not lines:
+            return
+        data = "".join(lines).encode("utf-8")
+        try:
+            if self._size() + len(data) > self.maxBytes:
+                self._rotate()
+            with open(self.path, "ab") as fh:
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+        except OSError:
+            logger.exception("Could not write %s", self.path)
+
+    def _size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _rotate(self):
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.1")
+
+
+textLog = LogWriter(
+    LOG_FILE, LOG_MAX_BYTES, LOG_BACKUPS, LOG_FLUSH_SIZE, LOG_FLUSH_INTERVAL
+)
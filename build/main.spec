@@ -1,10 +1,18 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+
 from PyInstaller.utils.hooks import collect_data_files
 from PyInstaller.utils.hooks import copy_metadata
 
+# Set CLOE_ONNX_ONLY=1 to leave torch out of the bundle. Export the graphs
+# first with `python -m utils.engine` in the app directory; the bundle then
+# runs the ONNX Runtime engine only.
+ONNX_ONLY = os.environ.get('CLOE_ONNX_ONLY') == '1'
+
 datas = []
 datas += collect_data_files('unidic_lite')
-datas += collect_data_files('manga_ocr')
+if not ONNX_ONLY:
+  datas += collect_data_files('manga_ocr')
 datas += copy_metadata('tqdm')
 datas += copy_metadata('regex')
 datas += copy_metadata('requests')
@@ -16,6 +24,11 @@ datas += copy_metadata('tokenizers')
 local_files = [
   ('../app/assets', './assets')
 ]
+if ONNX_ONLY:
+  local_files += [
+    ('../app/utils/cloe-onnx', './utils/cloe-onnx'),
+    ('./onnx/cloe-performance.ini', './utils'),
+  ]
 
 
 block_cipher = None
@@ -34,7 +47,7 @@ a = Analysis(['../app/main.py'],
              hookspath=[],
              hooksconfig={},
              runtime_hooks=[],
-             excludes=[],
+             excludes=['torch', 'torchvision', 'transformers', 'manga_ocr'] if ONNX_ONLY else [],
              win_no_prefer_redirects=False,
              win_private_assemblies=False,
              cipher=block_cipher,